@@ -0,0 +1,327 @@
+"""
+Measure how the cost of updating and drawing the game scales.
+
+Every scenario builds a World in a known state and steps it with scripted
+input. The logic half only needs the World and runs everywhere, the drawing
+half needs an OpenGL context and is skipped when none can be created.
+
+Usage:
+    python benchmark.py --output bench.json
+    python benchmark.py --compare bench.json
+    python benchmark.py --draw --headless
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+
+# Defaults for the runs
+BENCH_TICKS = 300
+BENCH_WARMUP_TICKS = 30
+BENCH_SEED = 1
+BENCH_DELTA_TIME = 1 / 60
+
+
+def make_inputs(tick):
+    """
+    The scripted input for a tick. Drives in circles and fires now and then.
+    """
+    from my_world import PlayerInput
+
+    return PlayerInput(
+        forward=True,
+        left=tick % 4 == 0,
+        canon_left=True,
+        fire=tick % 15 == 0
+    )
+
+
+def scenario_wave_1(world):
+    """
+    The first wave, as the game starts
+    """
+
+
+def scenario_wave_50(world):
+    """
+    The enemies of wave 50
+    """
+    for e in list(world.enemy_sprite_list):
+        e.kill()
+    # setup() only queued the first wave, drop it before queueing wave 50
+    world.spawner.pending = 0
+    world.wave_number = world.start_new_wave(49)
+
+
+def scenario_shots_500(world):
+    """
+    500 live shots flying in all directions
+    """
+    for i in range(500):
+        world.canon_sprite.angle = i * 360 / 500
+        world.fire()
+
+
+def scenario_tire_tracks_5000(world):
+    """
+    5000 tire tracks on the ground
+    """
+    from my_decals import DecalRing
+
+    # Room for all of them, the game keeps only the newest few hundred
+    tracks = world.tire_tracks
+    world.tire_tracks = DecalRing(
+        sprite_list=tracks.sprite_list,
+        make_sprite=tracks.make_sprite,
+        capacity=5000,
+        lifetime_seconds=tracks.lifetime_seconds
+    )
+
+    player = world.player_sprite
+    for i in range(5000):
+        player.center_x = world.rng.randint(0, world.width)
+        player.center_y = world.rng.randint(0, world.height)
+        player.angle = world.rng.randint(0, 360)
+        world.tire_tracks.spawn(player)
+
+    player.center_x = world.width / 2
+    player.center_y = world.height / 2
+
+
+def scenario_pickup_pile_up(world):
+    """
+    The coins and fuel of a long session nobody collected
+    """
+    # Room for all of them, the game keeps only a few of each
+    world.pickups.types["coins"].capacity = 1000
+    world.pickups.types["fuel"].capacity = 1000
+    for i in range(1000):
+        world.pickups.spawn("coins")
+        world.pickups.spawn("fuel")
+
+
+def scenario_chain_kill(world):
+    """
+    The explosions of 100 enemies killed at once
+    """
+    from my_world import EXPLOSION_PARTICLES
+
+    for i in range(100):
+        position = (world.rng.randint(0, world.width), world.rng.randint(0, world.height))
+        world.explosions.emit(position, count=EXPLOSION_PARTICLES)
+
+
+def scenario_large_world(world):
+    """
+    The enemies of wave 50 and lots of pickups in a world 20 screens wide
+    """
+    scenario_pickup_pile_up(world)
+    scenario_wave_50(world)
+
+
+SCENARIOS = {
+    "wave_1": scenario_wave_1,
+    "wave_50": scenario_wave_50,
+    "shots_500": scenario_shots_500,
+    "tire_tracks_5000": scenario_tire_tracks_5000,
+    "pickup_pile_up": scenario_pickup_pile_up,
+    "chain_kill": scenario_chain_kill,
+    "large_world": scenario_large_world,
+}
+
+# The size of the world of the scenarios not played on one screen
+WORLD_SIZES = {
+    "large_world": (16000, 12000),
+}
+
+
+def build_world(name, seed):
+    """
+    A World set up for the named scenario
+    """
+    from my_world import World, SCREEN_WIDTH, SCREEN_HEIGHT
+
+    width, height = WORLD_SIZES.get(name, (SCREEN_WIDTH, SCREEN_HEIGHT))
+    world = World(width, height, seed=seed)
+    world.setup()
+    SCENARIOS[name](world)
+    return world
+
+
+def count_sprites(world):
+    """
+    The number of sprites in the world
+    """
+    return (
+        2
+        + len(world.player_shot_list)
+        + len(world.enemy_sprite_list)
+        + len(world.explosions)
+        + len(world.coin_sprite_list)
+        + len(world.fuel_sprite_list)
+        + len(world.tire_track_list)
+    )
+
+
+def percentile(values, p):
+    """
+    The p'th percentile of a list of values
+    """
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(times, sprites):
+    """
+    Statistics for a list of tick times in seconds
+    """
+    ms = [t * 1000 for t in times]
+    total = sum(times)
+
+    return {
+        "ticks": len(times),
+        "mean_ms": statistics.mean(ms),
+        "p50_ms": percentile(ms, 50),
+        "p95_ms": percentile(ms, 95),
+        "p99_ms": percentile(ms, 99),
+        "max_ms": max(ms),
+        "sprites": sprites,
+        "sprites_per_second": sprites * len(times) / total if total else 0,
+    }
+
+
+def bench_update(name, ticks, seed):
+    """
+    Time World.step for a scenario
+    """
+    world = build_world(name, seed)
+
+    for tick in range(BENCH_WARMUP_TICKS):
+        world.step(BENCH_DELTA_TIME, make_inputs(tick))
+
+    sprites = []
+    times = []
+    for tick in range(ticks):
+        inputs = make_inputs(tick)
+        sprites.append(count_sprites(world))
+        start = time.perf_counter()
+        world.step(BENCH_DELTA_TIME, inputs)
+        times.append(time.perf_counter() - start)
+
+    return summarize(times, statistics.mean(sprites))
+
+
+def bench_draw(window, name, ticks, seed):
+    """
+    Time MyGame.on_draw for a scenario
+    """
+    window.world = build_world(name, seed)
+    window.setup_drawing()
+
+    for tick in range(BENCH_WARMUP_TICKS):
+        window.on_draw()
+    window.ctx.finish()
+
+    times = []
+    for tick in range(ticks):
+        start = time.perf_counter()
+        window.on_draw()
+        # Wait for the GPU so the time includes the actual drawing
+        window.ctx.finish()
+        times.append(time.perf_counter() - start)
+
+    return summarize(times, count_sprites(window.world))
+
+
+def make_window():
+    """
+    A game window to draw in, or None if there is no OpenGL context
+    """
+    try:
+        from my_game import MyGame
+        from my_world import SCREEN_WIDTH, SCREEN_HEIGHT
+
+        window = MyGame(SCREEN_WIDTH, SCREEN_HEIGHT)
+        window.set_visible(False)
+
+        # Load the textures now, the scenarios make their own worlds. Until
+        # the startup is done on_draw only draws the loading screen.
+        window.startup.start()
+        window.startup.run()
+    except Exception as e:
+        print("Skipping draw benchmarks: {}".format(e), file=sys.stderr)
+        return None
+
+    return window
+
+
+def compare(results, baseline):
+    """
+    Print how the mean tick time changed since the baseline
+    """
+    for half in ("update", "draw"):
+        for name, result in results.get(half, {}).items():
+            old = baseline.get(half, {}).get(name)
+            if old is None:
+                continue
+            change = (result["mean_ms"] - old["mean_ms"]) / old["mean_ms"] * 100
+            print("{:>6} {:<20} {:8.3f} ms -> {:8.3f} ms ({:+.1f}%)".format(
+                half, name, old["mean_ms"], result["mean_ms"], change
+            ))
+
+
+def main():
+    """
+    Main method
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="Scenario to run. Can be given more than once. Default is all.")
+    parser.add_argument("--ticks", type=int, default=BENCH_TICKS, help="Ticks to time per scenario")
+    parser.add_argument("--seed", type=int, default=BENCH_SEED, help="Seed for the world")
+    parser.add_argument("--draw", action="store_true", help="Also time drawing")
+    parser.add_argument("--headless", action="store_true", help="Draw in an offscreen OpenGL context")
+    parser.add_argument("--output", help="Save the results as JSON in this file")
+    parser.add_argument("--compare", help="Compare with results saved earlier")
+    args = parser.parse_args()
+
+    if args.headless:
+        # Must be set before arcade is imported
+        os.environ["ARCADE_HEADLESS"] = "1"
+
+    names = args.scenario or list(SCENARIOS)
+    results = {"seed": args.seed, "ticks": args.ticks, "update": {}, "draw": {}}
+
+    for name in names:
+        result = bench_update(name, args.ticks, args.seed)
+        results["update"][name] = result
+        print("update {:<20} {:8.3f} ms/tick  p95 {:8.3f} ms  {:10.0f} sprites/s".format(
+            name, result["mean_ms"], result["p95_ms"], result["sprites_per_second"]
+        ))
+
+    if args.draw:
+        window = make_window()
+        if window is not None:
+            for name in names:
+                result = bench_draw(window, name, args.ticks, args.seed)
+                results["draw"][name] = result
+                print("  draw {:<20} {:8.3f} ms/tick  p95 {:8.3f} ms  {:10.0f} sprites/s".format(
+                    name, result["mean_ms"], result["p95_ms"], result["sprites_per_second"]
+                ))
+            window.close()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Worlds larger than the screen.
+
+The world is cut into square chunks. Sprites that do not move, like pickups,
+are kept in one sprite list per chunk so only the chunks in view are drawn.
+Enemies far from the view are taken out of the swarm and kept as plain
+numbers, moved now and then in one cheap pass, and turned back into sprites
+when they get close to the view again. The cost of a frame then follows the
+size of the view and not the size of the world.
+"""
+
+import itertools
+
+import arcade
+import numpy as np
+
+
+class ChunkedSpriteList:
+    """
+    Sprites that do not move, kept in one sprite list per chunk. Can be used
+    in place of a SpriteList for appending, counting and drawing.
+    """
+
+    def __init__(self, chunk_size):
+        """
+        Setup new ChunkedSpriteList object
+        """
+        self.chunk_size = chunk_size
+
+        # The sprite list of every chunk holding sprites, by chunk
+        self.chunks = {}
+
+        # The part of the world to draw, None to draw all of it
+        self.view = None
+
+    def chunk_of(self, x, y):
+        """
+        The chunk a position is in
+        """
+        return (int(x // self.chunk_size), int(y // self.chunk_size))
+
+    def append(self, sprite):
+        """
+        Add a sprite to the chunk it is in
+        """
+        chunk = self.chunk_of(*sprite.position)
+        sprite_list = self.chunks.get(chunk)
+        if sprite_list is None:
+            sprite_list = self.chunks[chunk] = arcade.SpriteList()
+        sprite_list.append(sprite)
+
+    def __len__(self):
+        return sum(len(sprite_list) for sprite_list in self.chunks.values())
+
+    def __iter__(self):
+        return itertools.chain.from_iterable(list(self.chunks.values()))
+
+    def lists_in(self, left, bottom, right, top):
+        """
+        The sprite lists of the chunks overlapping a rectangle. Sprites stick
+        out of their chunk, so the chunks next to it are included.
+        """
+        c0, r0 = self.chunk_of(left, bottom)
+        c1, r1 = self.chunk_of(right, top)
+        for c in range(c0 - 1, c1 + 2):
+            for r in range(r0 - 1, r1 + 2):
+                sprite_list = self.chunks.get((c, r))
+                if sprite_list:
+                    yield sprite_list
+
+    def draw(self):
+        """
+        Draw the chunks in view
+        """
+        if self.view is None:
+            lists = self.chunks.values()
+        else:
+            lists = self.lists_in(*self.view)
+
+        for sprite_list in lists:
+            sprite_list.draw()
+
+
+class SuspendedEnemies:
+    """
+    Enemies far from the view, kept as arrays instead of sprites
+    """
+
+    def __init__(self, swarm, pool, sprite_list, margin):
+        """
+        Setup new SuspendedEnemies object
+        """
+        self.swarm = swarm
+        self.pool = pool
+        self.sprite_list = sprite_list
+
+        # Enemies within this many pixels of the view are sprites. They are
+        # suspended again at twice the distance, so they do not flicker
+        # between the two at the border.
+        self.margin = margin
+
+        self.x = np.zeros(0)
+        self.y = np.zeros(0)
+        self.angle = np.zeros(0)
+        self.speed = np.zeros(0, dtype=np.float32)
+
+    def __len__(self):
+        return len(self.x)
+
+    def update(self, delta_time, view, target_x, target_y):
+        """
+        Move the suspended enemies towards the target, wake the ones close
+        to the view and suspend the ones far from it. delta_time is the time
+        since the last update.
+        """
+        left, bottom, right, top = view
+
+        # The far away enemies walk straight at the target, there is
+        # nobody watching them
+        if len(self.x):
+            dx = target_x - self.x
+            dy = target_y - self.y
+            distance = np.maximum(np.hypot(dx, dy), 1e-9)
+            step = np.minimum(self.speed * delta_time, distance)
+            self.x += dx / distance * step
+            self.y += dy / distance * step
+            self.angle = np.degrees(np.arctan2(dx, dy))
+
+        # Suspend the enemies far from the view
+        far = 2 * self.margin
+        store = self.swarm.store
+        if len(store):
+            x = store["x"]
+            y = store["y"]
+            outside = (x < left - far) | (x > right + far) | (y < bottom - far) | (y > top + far)
+            indices = np.flatnonzero(outside)[::-1]
+            if len(indices):
+                sprites = [store.views[i] for i in indices]
+                self.x = np.concatenate([self.x, x[indices]])
+                self.y = np.concatenate([self.y, y[indices]])
+                self.angle = np.concatenate([self.angle, [s.angle for s in sprites]])
+                self.speed = np.concatenate([self.speed, store["speed"][indices]])
+                for sprite in sprites:
+                    sprite.kill()
+
+        # Wake the enemies close to the view
+        near = self.margin
+        inside = (
+            (self.x >= left - near) & (self.x <= right + near)
+            & (self.y >= bottom - near) & (self.y <= top + near)
+        )
+        if inside.any():
+            for x, y, angle, speed in zip(
+                self.x[inside].tolist(),
+                self.y[inside].tolist(),
+                self.angle[inside].tolist(),
+                self.speed[inside].tolist()
+            ):
+                enemy = self.pool.acquire()
+                enemy.position = (x, y)
+                enemy.angle = angle
+                self.sprite_list.append(enemy)
+                self.swarm.add(enemy, speed=speed)
+
+            keep = ~inside
+            self.x = self.x[keep]
+            self.y = self.y[keep]
+            self.angle = self.angle[keep]
+            self.speed = self.speed[keep]
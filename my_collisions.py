@@ -0,0 +1,139 @@
+"""
+Broadphase collision detection for the sprite lists in the game.
+
+Sprite lists register with a SpatialHash under a name. Lists of moving
+sprites are rebuilt once per tick, lists of sprites that do not move are
+updated with insert() and remove(). Only sprites sharing a grid cell are
+handed to the exact arcade collision test.
+"""
+
+import arcade
+
+
+class SpatialHash:
+    """
+    A uniform grid that buckets the sprites of the registered sprite lists
+    """
+
+    def __init__(self, cell_size=64):
+        """
+        Setup new SpatialHash object
+        """
+        self.cell_size = cell_size
+
+        # The sprite lists we are keeping track of, by name
+        self.sprite_lists = {}
+
+        # For every registered name a dict of cell -> list of sprites
+        self.buckets = {}
+
+        # Names of the lists that are not rebuilt every tick
+        self.static = set()
+
+    def register(self, name, sprite_list, static=False):
+        """
+        Start tracking a sprite list under the given name. The sprites of a
+        static list must be added and removed with insert() and remove().
+        """
+        self.sprite_lists[name] = sprite_list
+        self.buckets[name] = {}
+        if static:
+            self.static.add(name)
+
+    def unregister(self, name):
+        """
+        Stop tracking the sprite list with the given name
+        """
+        del self.sprite_lists[name]
+        del self.buckets[name]
+        self.static.discard(name)
+
+    def insert(self, name, sprite):
+        """
+        Add a sprite to the cells of a static list
+        """
+        buckets = self.buckets[name]
+        for cell in self._cells(sprite):
+            if cell in buckets:
+                buckets[cell].append(sprite)
+            else:
+                buckets[cell] = [sprite]
+
+    def remove(self, name, sprite):
+        """
+        Remove a sprite from the cells of a static list
+        """
+        buckets = self.buckets[name]
+        for cell in self._cells(sprite):
+            bucket = buckets.get(cell)
+            if bucket is not None and sprite in bucket:
+                bucket.remove(sprite)
+                if not bucket:
+                    del buckets[cell]
+
+    def _cells(self, sprite):
+        """
+        The grid cells covered by the collision circle of a sprite
+        """
+        r = sprite.collision_radius
+        x, y = sprite.position
+        size = self.cell_size
+
+        for cx in range(int((x - r) // size), int((x + r) // size) + 1):
+            for cy in range(int((y - r) // size), int((y + r) // size) + 1):
+                yield (cx, cy)
+
+    def rebuild(self):
+        """
+        Put all sprites of the lists that are not static in their current
+        cells. Call this once per tick after the sprites have moved.
+        """
+        for name, sprite_list in self.sprite_lists.items():
+            if name in self.static:
+                continue
+            buckets = {}
+            for sprite in sprite_list:
+                for cell in self._cells(sprite):
+                    if cell in buckets:
+                        buckets[cell].append(sprite)
+                    else:
+                        buckets[cell] = [sprite]
+            self.buckets[name] = buckets
+
+    def nearby(self, sprite, name):
+        """
+        Sprites in the list called name that share a cell with sprite
+        """
+        buckets = self.buckets[name]
+        found = []
+        seen = set()
+
+        for cell in self._cells(sprite):
+            for other in buckets.get(cell, ()):
+                if id(other) not in seen:
+                    seen.add(id(other))
+                    found.append(other)
+
+        return found
+
+    def collisions_with_sprite(self, sprite, name):
+        """
+        Sprites in the list called name that collide with sprite
+        """
+        return [
+            other for other in self.nearby(sprite, name)
+            if other is not sprite and arcade.check_for_collision(sprite, other)
+        ]
+
+    def collisions(self, name_a, name_b):
+        """
+        All colliding pairs (a, b) where a is in the list called name_a
+        and b is in the list called name_b
+        """
+        pairs = []
+        for a in self.sprite_lists[name_a]:
+            for b in self.nearby(a, name_b):
+                if arcade.check_for_collision(a, b):
+                    pairs.append((a, b))
+
+        return pairs
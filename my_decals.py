@@ -0,0 +1,84 @@
+"""
+Marks left on the ground, like tire tracks.
+
+A DecalRing has room for a fixed number of decals. When it is full the
+oldest decal is reused, so the cost does not grow with the length of the
+game. The fade of all decals is computed from their spawn time in one pass.
+"""
+
+import numpy as np
+
+
+class DecalRing:
+    """
+    A fixed number of decals that fade out and are reused, oldest first
+    """
+
+    def __init__(self, sprite_list, make_sprite, capacity, lifetime_seconds):
+        """
+        Setup new DecalRing object
+        """
+        # The list the decal sprites are drawn from
+        self.sprite_list = sprite_list
+
+        # Function creating a new decal sprite
+        self.make_sprite = make_sprite
+
+        self.capacity = capacity
+        self.lifetime_seconds = lifetime_seconds
+
+        # The decals in the order of the ring
+        self.sprites = []
+
+        # Where the next decal goes in the ring
+        self.next = 0
+
+        # Time since the ring was created
+        self.time = 0
+
+        self.spawn_time = np.full(capacity, -np.inf)
+        self.alpha = np.zeros(capacity, dtype=np.int32)
+
+    def __len__(self):
+        return len(self.sprites)
+
+    def spawn(self, target_sprite):
+        """
+        Put a decal where target_sprite is
+        """
+        i = self.next
+        if i == len(self.sprites):
+            sprite = self.make_sprite()
+            self.sprites.append(sprite)
+            self.sprite_list.append(sprite)
+        else:
+            sprite = self.sprites[i]
+
+        sprite.position = target_sprite.position
+        sprite.angle = target_sprite.angle
+        sprite.alpha = 255
+
+        self.spawn_time[i] = self.time
+        self.alpha[i] = 255
+        self.next = (i + 1) % self.capacity
+
+    def on_update(self, delta_time):
+        """
+        Fade all decals
+        """
+        self.time += delta_time
+
+        n = len(self.sprites)
+        if n == 0:
+            return
+
+        # Starts to fade when only half of the lifetime is left
+        half = self.lifetime_seconds / 2
+        left = self.lifetime_seconds - (self.time - self.spawn_time[:n])
+        alpha = (np.clip(left / half, 0, 1) * 255).astype(np.int32)
+
+        # Only touch the sprites that changed
+        changed = np.flatnonzero(alpha != self.alpha[:n])
+        for i, a in zip(changed.tolist(), alpha[changed].tolist()):
+            self.sprites[i].alpha = a
+        self.alpha[:n] = alpha
@@ -0,0 +1,89 @@
+"""
+Compact storage for the state of many game objects.
+
+A ComponentStore keeps every component (x, y, speed, ...) of its entities in
+a NumPy array of its own, with the entities packed at the front. Systems
+like the EnemySwarm run over these arrays instead of over sprite attributes,
+and the sprites are only views used for drawing and collisions.
+"""
+
+import numpy as np
+
+
+class ComponentStore:
+    """
+    Typed component arrays for a group of entities
+    """
+
+    def __init__(self, components, capacity=64):
+        """
+        Setup new ComponentStore object. components is a dict of
+        component name -> NumPy dtype.
+        """
+        self.dtypes = dict(components)
+        self.arrays = {name: np.zeros(capacity, dtype=dtype) for name, dtype in self.dtypes.items()}
+
+        # The view of each entity, in the same order as the arrays
+        self.views = []
+
+    def __len__(self):
+        return len(self.views)
+
+    def __getitem__(self, name):
+        """
+        The values of a component for all live entities. Changing the
+        returned array changes the store.
+        """
+        return self.arrays[name][:len(self.views)]
+
+    @property
+    def capacity(self):
+        return len(next(iter(self.arrays.values())))
+
+    def _grow(self):
+        """
+        Double the size of the arrays
+        """
+        for name, old in self.arrays.items():
+            new = np.zeros(len(old) * 2, dtype=old.dtype)
+            new[:len(old)] = old
+            self.arrays[name] = new
+
+    def add(self, view, **values):
+        """
+        Add an entity. The view gets its place in the arrays as entity_index.
+        Components not given are zero.
+        """
+        i = len(self.views)
+        if i == self.capacity:
+            self._grow()
+
+        for name, array in self.arrays.items():
+            array[i] = values.get(name, 0)
+
+        view.entity_index = i
+        self.views.append(view)
+        return i
+
+    def remove(self, view):
+        """
+        Remove an entity. The last entity takes its place in the arrays.
+        """
+        i = view.entity_index
+        last = len(self.views) - 1
+
+        if i != last:
+            moved = self.views[last]
+            self.views[i] = moved
+            moved.entity_index = i
+            for array in self.arrays.values():
+                array[i] = array[last]
+
+        self.views.pop()
+        view.entity_index = None
+
+    def memory(self):
+        """
+        Bytes used by the component arrays
+        """
+        return sum(array.nbytes for array in self.arrays.values())
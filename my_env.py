@@ -0,0 +1,252 @@
+"""
+Runs many games at once for bots and training.
+
+VectorEnv steps N independent Worlds per call. Actions go in and
+observations, rewards and done flags come out as NumPy arrays. The games can
+be split over worker processes to use every core.
+
+An action is an int with a bit per PlayerInput flag, see INPUT_FLAGS in
+my_replay.py.
+
+    env = VectorEnv(num_envs=64, num_workers=4, seed=1)
+    obs = env.reset()
+    obs, rewards, dones = env.step(np.zeros(64, dtype=np.int64))
+    env.close()
+"""
+import multiprocessing
+
+import numpy as np
+
+from my_world import World
+from my_replay import unpack_input, INPUT_FLAGS
+
+
+# Number of different actions
+NUM_ACTIONS = 2 ** len(INPUT_FLAGS)
+
+# Number of closest enemies in an observation
+OBS_ENEMIES = 8
+
+# player x, y, sin/cos angle, fuel, energy, sin/cos canon angle, wave,
+# closest coin dx, dy, closest fuel dx, dy and dx, dy of the closest enemies
+OBS_SIZE = 13 + 2 * OBS_ENEMIES
+
+# Seconds per step and steps per game before it is reset
+ENV_DELTA_TIME = 1 / 60
+ENV_MAX_TICKS = 60 * 60 * 5
+
+# Reward lost per point of energy lost
+ENERGY_PENALTY = 0.1
+
+
+class Env:
+    """
+    A single game stepped with actions
+    """
+
+    def __init__(self, seed, max_ticks=ENV_MAX_TICKS, delta_time=ENV_DELTA_TIME):
+        """
+        Setup new Env object
+        """
+        self.seed = seed
+        self.max_ticks = max_ticks
+        self.delta_time = delta_time
+
+        # Every reset plays a new game
+        self.games = 0
+        self.world = None
+
+    def reset(self):
+        """
+        Start a new game. Returns the first observation.
+        """
+        self.world = World(seed=self.seed * 1000003 + self.games)
+        self.world.setup()
+        self.games += 1
+        return self.observe()
+
+    def step(self, action):
+        """
+        Step the game with an action. Returns observation, reward and done.
+        A finished game is reset, and the observation is of the new game.
+        """
+        world = self.world
+        player = world.player_sprite
+        coins = player.coins
+        energy = player.energy
+
+        world.step(self.delta_time, unpack_input(int(action)))
+
+        reward = (player.coins - coins) - (energy - player.energy) * ENERGY_PENALTY
+        done = player.energy <= 0 or world.ticks >= self.max_ticks
+
+        if done:
+            return self.reset(), reward, True
+        return self.observe(), reward, False
+
+    def observe(self):
+        """
+        The state of the game as seen by the player, scaled to about -1..1
+        """
+        world = self.world
+        player = world.player_sprite
+        px, py = player.position
+        width = world.width
+        height = world.height
+
+        obs = np.zeros(OBS_SIZE, dtype=np.float32)
+        obs[0] = px / width
+        obs[1] = py / height
+        obs[2] = np.sin(player.radians)
+        obs[3] = np.cos(player.radians)
+        obs[4] = player.fuel / 100
+        obs[5] = player.energy / player.max_energy
+        obs[6] = np.sin(world.canon_sprite.radians)
+        obs[7] = np.cos(world.canon_sprite.radians)
+        obs[8] = world.wave_number / 100
+
+        for i, sprite_list in ((9, world.coin_sprite_list), (11, world.fuel_sprite_list)):
+            if len(sprite_list):
+                closest = closest_position(px, py, sprite_list)
+                obs[i] = (closest[0] - px) / width
+                obs[i + 1] = (closest[1] - py) / height
+
+        store = world.enemy_swarm.store
+        if len(store):
+            dx = (store["x"] - px) / width
+            dy = (store["y"] - py) / height
+            order = np.argsort(dx * dx + dy * dy)[:OBS_ENEMIES]
+            obs[13:13 + 2 * len(order):2] = dx[order]
+            obs[14:14 + 2 * len(order):2] = dy[order]
+
+        return obs
+
+
+def closest_position(x, y, sprite_list):
+    """
+    Position of the sprite in the list closest to x, y
+    """
+    return min(
+        (s.position for s in sprite_list),
+        key=lambda p: (p[0] - x) ** 2 + (p[1] - y) ** 2
+    )
+
+
+class EnvGroup:
+    """
+    Several Envs stepped together in one process
+    """
+
+    def __init__(self, seeds, max_ticks=ENV_MAX_TICKS):
+        """
+        Setup new EnvGroup object
+        """
+        self.envs = [Env(seed, max_ticks=max_ticks) for seed in seeds]
+
+    def reset(self):
+        return np.stack([env.reset() for env in self.envs])
+
+    def step(self, actions):
+        obs = np.zeros((len(self.envs), OBS_SIZE), dtype=np.float32)
+        rewards = np.zeros(len(self.envs), dtype=np.float32)
+        dones = np.zeros(len(self.envs), dtype=bool)
+
+        for i, (env, action) in enumerate(zip(self.envs, actions)):
+            obs[i], rewards[i], dones[i] = env.step(action)
+
+        return obs, rewards, dones
+
+
+def _worker(connection, seeds, max_ticks):
+    """
+    Runs an EnvGroup in a worker process, driven through a pipe
+    """
+    group = EnvGroup(seeds, max_ticks=max_ticks)
+    while True:
+        command, data = connection.recv()
+        if command == "step":
+            connection.send(group.step(data))
+        elif command == "reset":
+            connection.send(group.reset())
+        elif command == "close":
+            connection.close()
+            break
+
+
+class VectorEnv:
+    """
+    N games stepped together, optionally split over worker processes
+    """
+
+    def __init__(self, num_envs, seed=0, num_workers=0, max_ticks=ENV_MAX_TICKS):
+        """
+        Setup new VectorEnv object. With num_workers of 0 all games run in
+        this process.
+        """
+        self.num_envs = num_envs
+        seeds = [seed + i for i in range(num_envs)]
+
+        self.group = None
+        self.connections = []
+        self.processes = []
+
+        # The slice of the games each worker runs
+        self.slices = []
+
+        if num_workers <= 0:
+            self.group = EnvGroup(seeds, max_ticks=max_ticks)
+            return
+
+        num_workers = min(num_workers, num_envs)
+        bounds = np.linspace(0, num_envs, num_workers + 1).astype(int)
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_worker,
+                args=(child, seeds[start:stop], max_ticks),
+                daemon=True
+            )
+            process.start()
+            child.close()
+            self.connections.append(parent)
+            self.processes.append(process)
+            self.slices.append(slice(start, stop))
+
+    def reset(self):
+        """
+        Start new games. Returns the observations, shape (num_envs, OBS_SIZE).
+        """
+        if self.group is not None:
+            return self.group.reset()
+
+        for connection in self.connections:
+            connection.send(("reset", None))
+        return np.concatenate([connection.recv() for connection in self.connections])
+
+    def step(self, actions):
+        """
+        Step every game with its action. Returns observations, rewards and
+        done flags. Finished games are reset.
+        """
+        actions = np.asarray(actions)
+        if self.group is not None:
+            return self.group.step(actions)
+
+        # Send all actions first, so the workers step at the same time
+        for connection, part in zip(self.connections, self.slices):
+            connection.send(("step", actions[part]))
+        results = [connection.recv() for connection in self.connections]
+
+        return tuple(np.concatenate(parts) for parts in zip(*results))
+
+    def close(self):
+        """
+        Stop the worker processes
+        """
+        for connection in self.connections:
+            connection.send(("close", None))
+            connection.close()
+        for process in self.processes:
+            process.join()
+        self.connections = []
+        self.processes = []
@@ -0,0 +1,258 @@
+"""
+Shared pathfinding for all the enemies.
+
+The world is cut into a grid. When the target, the player, moves into a new
+cell the FlowField finds the distance from every cell to the target once,
+and from that the direction to walk in every cell. An enemy then only has to
+look up the direction of the cell it is in, so moving the swarm costs the
+same for any number of enemies.
+
+Cells with a straight, free line to the target are marked as direct. Enemies
+in those cells head straight for the target instead of following the grid.
+In a large world only the cells within a radius of the target are computed,
+the cells outside it are marked as direct.
+"""
+
+import heapq
+import math
+
+import numpy as np
+
+
+# The 8 neighbours of a cell and the cost of stepping to them
+NEIGHBOURS = [
+    (1, 0), (-1, 0), (0, 1), (0, -1),
+    (1, 1), (1, -1), (-1, 1), (-1, -1),
+]
+NEIGHBOUR_COSTS = [1, 1, 1, 1, math.sqrt(2), math.sqrt(2), math.sqrt(2), math.sqrt(2)]
+
+
+class FlowField:
+    """
+    The direction towards a target for every cell of a grid
+    """
+
+    def __init__(self, width, height, cell_size=32, radius=None):
+        """
+        Setup new FlowField object. radius is the number of cells around the
+        target that are computed, None for all of them.
+        """
+        self.cell_size = cell_size
+        self.radius = radius
+        self.columns = max(1, math.ceil(width / cell_size))
+        self.rows = max(1, math.ceil(height / cell_size))
+        shape = (self.columns, self.rows)
+
+        # Cells nothing can move through
+        self.blocked = np.zeros(shape, dtype=bool)
+
+        # Cost of walking from a cell to the target
+        self.distance = np.full(shape, np.inf)
+
+        # The direction to walk in every cell, as unit vectors
+        self.heading_x = np.zeros(shape, dtype=np.float32)
+        self.heading_y = np.zeros(shape, dtype=np.float32)
+
+        # Cells with a free straight line to the target
+        self.direct = np.ones(shape, dtype=bool)
+
+        # The cell the field was computed for, None when it must be computed
+        self.target_cell = None
+
+        # Number of times the field has been computed
+        self.recomputes = 0
+
+    def cell_of(self, x, y):
+        """
+        The column and row of the cell a position is in. Positions outside
+        the grid are moved to the closest cell. Works on arrays too.
+        """
+        column = np.clip(np.floor_divide(x, self.cell_size).astype(np.int64), 0, self.columns - 1)
+        row = np.clip(np.floor_divide(y, self.cell_size).astype(np.int64), 0, self.rows - 1)
+        return column, row
+
+    def block(self, left, bottom, right, top):
+        """
+        Mark the cells covered by a rectangle as blocked
+        """
+        c0, r0 = self.cell_of(left, bottom)
+        c1, r1 = self.cell_of(right, top)
+        self.blocked[int(c0):int(c1) + 1, int(r0):int(r1) + 1] = True
+        self.target_cell = None
+
+    def update(self, target_x, target_y):
+        """
+        Compute the field for a new target position. Nothing is done while
+        the target stays in the same cell. Returns True if it was computed.
+        """
+        column, row = self.cell_of(target_x, target_y)
+        cell = (int(column), int(row))
+        if cell == self.target_cell:
+            return False
+        self.target_cell = cell
+
+        # The part of the grid to compute
+        c0, c1, r0, r1 = 0, self.columns, 0, self.rows
+        if self.radius is not None:
+            c0 = max(cell[0] - self.radius, 0)
+            c1 = min(cell[0] + self.radius + 1, self.columns)
+            r0 = max(cell[1] - self.radius, 0)
+            r1 = min(cell[1] + self.radius + 1, self.rows)
+        blocked = self.blocked[c0:c1, r0:r1]
+        target = (cell[0] - c0, cell[1] - r0)
+
+        distance = walking_distance(blocked, target)
+        heading_x, heading_y = headings(distance, blocked, target)
+        direct = direct_cells(blocked, target)
+
+        if (c0, c1, r0, r1) == (0, self.columns, 0, self.rows):
+            self.distance = distance
+            self.heading_x = heading_x
+            self.heading_y = heading_y
+            self.direct = direct
+        else:
+            self.distance.fill(np.inf)
+            self.heading_x.fill(0)
+            self.heading_y.fill(0)
+            self.direct.fill(True)
+            self.distance[c0:c1, r0:r1] = distance
+            self.heading_x[c0:c1, r0:r1] = heading_x
+            self.heading_y[c0:c1, r0:r1] = heading_y
+            self.direct[c0:c1, r0:r1] = direct
+
+        self.recomputes += 1
+        return True
+
+    def blocked_at(self, x, y):
+        """
+        True for the positions in blocked cells. Works on arrays too.
+        """
+        return self.blocked[self.cell_of(x, y)]
+
+    def free_cells(self):
+        """
+        The centers of the cells that are not blocked, as (x, y)
+        """
+        columns, rows = np.nonzero(~self.blocked)
+        return list(zip(
+            ((columns + 0.5) * self.cell_size).tolist(),
+            ((rows + 0.5) * self.cell_size).tolist()
+        ))
+
+    def lookup(self, x, y):
+        """
+        The heading and direct flag for arrays of positions
+        """
+        column, row = self.cell_of(x, y)
+        return self.heading_x[column, row], self.heading_y[column, row], self.direct[column, row]
+
+
+def walking_distance(blocked, target):
+    """
+    The cost of walking from every cell of a grid to the target cell.
+    Dijkstra over the free cells.
+    """
+    columns, rows = blocked.shape
+
+    if not blocked.any():
+        # Nothing in the way, the distance is the same as walking it
+        c, r = np.meshgrid(np.arange(columns), np.arange(rows), indexing="ij")
+        dc = np.abs(c - target[0])
+        dr = np.abs(r - target[1])
+        return np.maximum(dc, dr) + (math.sqrt(2) - 1) * np.minimum(dc, dr)
+
+    # A flat grid with a blocked border, so neighbours need no bounds checks
+    stride = rows + 2
+    padded = np.pad(blocked, 1, constant_values=True).ravel().tolist()
+    steps = [
+        (dc * stride + dr, cost, dc * stride if dc and dr else 0, dr if dc and dr else 0)
+        for (dc, dr), cost in zip(NEIGHBOURS, NEIGHBOUR_COSTS)
+    ]
+
+    distance = [math.inf] * len(padded)
+    start = (target[0] + 1) * stride + target[1] + 1
+    distance[start] = 0
+    queue = [(0, start)]
+    while queue:
+        d, i = heapq.heappop(queue)
+        if d > distance[i]:
+            continue
+        for step, cost, corner_a, corner_b in steps:
+            n = i + step
+            if padded[n]:
+                continue
+            # No cutting corners past blocked cells
+            if corner_a and (padded[i + corner_a] or padded[i + corner_b]):
+                continue
+            nd = d + cost
+            if nd < distance[n]:
+                distance[n] = nd
+                heapq.heappush(queue, (nd, n))
+
+    return np.array(distance).reshape(columns + 2, stride)[1:-1, 1:-1]
+
+
+def headings(distance, blocked, target):
+    """
+    Unit vectors pointing every cell at its neighbour closest to the target
+    """
+    columns, rows = blocked.shape
+
+    if not blocked.any():
+        # Nothing in the way, point straight at the target cell
+        c, r = np.meshgrid(np.arange(columns), np.arange(rows), indexing="ij")
+        dc = (target[0] - c).astype(np.float32)
+        dr = (target[1] - r).astype(np.float32)
+        length = np.hypot(dc, dr)
+        length[length == 0] = np.inf
+        return dc / length, dr / length
+
+    padded = np.pad(distance, 1, constant_values=np.inf)
+    padded_blocked = np.pad(blocked, 1, constant_values=True)
+
+    neighbour_distance = np.empty((len(NEIGHBOURS), columns, rows))
+    for i, (dc, dr) in enumerate(NEIGHBOURS):
+        d = padded[1 + dc:1 + dc + columns, 1 + dr:1 + dr + rows].copy()
+        if dc and dr:
+            corner = (
+                padded_blocked[1 + dc:1 + dc + columns, 1:1 + rows]
+                | padded_blocked[1:1 + columns, 1 + dr:1 + dr + rows]
+            )
+            d[corner] = np.inf
+        neighbour_distance[i] = d
+
+    best = np.argmin(neighbour_distance, axis=0)
+    offsets = np.array(NEIGHBOURS, dtype=np.float32)
+    offsets /= np.hypot(offsets[:, 0], offsets[:, 1])[:, None]
+
+    # The target cell and cells that can not reach it have no heading
+    moves = np.take_along_axis(neighbour_distance, best[None], axis=0)[0] < distance
+    heading_x = np.where(moves, offsets[best, 0], 0).astype(np.float32)
+    heading_y = np.where(moves, offsets[best, 1], 0).astype(np.float32)
+    return heading_x, heading_y
+
+
+def direct_cells(blocked, target):
+    """
+    The cells of a grid with a free straight line to the target cell.
+
+    The cells are visited in rings around the target. A cell can see the
+    target if it is free and the cell one ring further in on the line to the
+    target can see it.
+    """
+    if not blocked.any():
+        return np.ones(blocked.shape, dtype=bool)
+
+    columns, rows = blocked.shape
+    c, r = np.meshgrid(np.arange(columns), np.arange(rows), indexing="ij")
+    dc = c - target[0]
+    dr = r - target[1]
+    ring = np.maximum(np.abs(dc), np.abs(dr))
+
+    direct = ~blocked
+    for k in range(2, int(ring.max()) + 1):
+        in_ring = ring == k
+        pc = target[0] + np.rint(dc[in_ring] * (k - 1) / k).astype(np.int64)
+        pr = target[1] + np.rint(dr[in_ring] * (k - 1) / k).astype(np.int64)
+        direct[in_ring] &= direct[pc, pr]
+    return direct
@@ -6,111 +6,189 @@ This program uses the Arcade library found at http://arcade.academy
 Artwork from https://kenney.nl/assets/space-shooter-redux
 
 """
+import argparse
 import random
+import time
+
 import arcade
 
-from my_sprites import Player, PlayerShot, Enemy, Explosion, Canon, Coin, Fuel, TireTracks, LifeBar
+from my_hud import Hud, LifeBars, ProfilerOverlay
+from my_input import InputMapper
+from my_log import BufferedLog
+from my_loop import FixedTimestep
+from my_profiler import FrameProfiler
+from my_quality import QualityGovernor
+from my_replay import InputRecorder, Replay
+from my_startup import Startup
+from my_telemetry import Telemetry
+from my_world import World, SCREEN_WIDTH, SCREEN_HEIGHT, PLAYER_MAX_ENERGY
 
 
+ENERGY_GUI_SIZE_MULTIPLIER = 0.5
 
-SPRITE_SCALING = 1
+# Steps of the game rules per second
+TICK_RATE = 60
+# Most steps run in one frame when the game falls behind
+MAX_STEPS_PER_FRAME = 5
 
-# Set the size of the screen
-SCREEN_WIDTH = 800
-SCREEN_HEIGHT = 600
+# The progress bar of the loading screen
+LOADING_BAR_WIDTH = 400
+LOADING_BAR_HEIGHT = 20
 
-# Variables controlling the player
-PLAYER_LIVES = 3
-PLAYER_SPEED = 5
-PLAYER_TURN_SPEED = 5
-PLAYER_START_X = SCREEN_WIDTH / 2
-PLAYER_START_Y = 50
-PLAYER_KEY_LEFT = arcade.key.LEFT
-PLAYER_KEY_RIGHT = arcade.key.RIGHT
-PLAYER_KEY_FORWARD = arcade.key.UP
-PLAYER_KEY_BACKWARDS = arcade.key.DOWN
-PLAYER_START_ENERGY = 200
-PLAYER_MAX_ENERGY = 200
+class MyGame(arcade.Window):
+    """
+    Main application class.
 
-#variables controlling the player_shot
-PLAYER_SHOT_SPEED = 25
+    The game rules live in World, this class draws it and turns the
+    keyboard and joysticks into PlayerInput.
+    """
 
+    def __init__(self, width, height, profile_output=None, seed=None, record=None, replay=None,
+                 world_width=None, world_height=None, telemetry_output=None):
+        """
+        Initializer. The world is the size of the window unless a larger
+        world size is given, then the view follows the player. The world is
+        made while the loading screen is shown, see setup().
+        """
+        start = time.perf_counter()
 
-# variables controlling the canon
-CANON_ROTATE_SPEED = 5
-CANON_KEY_LEFT = arcade.key.A
-CANON_KEY_RIGHT = arcade.key.D
+        # Call the parent class initializer
+        super().__init__(width, height)
 
-# variables controlling the enemy
-BASE_NUMBER_OF_ENEMYS = 10
+        # Loads the textures and the world a bit every frame
+        self.startup = Startup(atlas=self.ctx.default_atlas, start_time=start)
+        self.startup.record("window", time.perf_counter() - start)
 
-# variables controlling the enemies
-ENEMY_MOVE_SPEED = 16
+        # Writes messages without holding up a frame
+        self.log = BufferedLog()
 
-# variables controlling the tire-
-TIRETRACK_LIFETIME_SECONDS = 10
+        # Times the phases of every frame, optionally writing them to a file
+        self.profiler = FrameProfiler(output=profile_output)
 
-FIRE_KEY = arcade.key.SPACE
+        # A recorded game played back instead of the keyboard and joysticks
+        self.replay = None
+        tick_rate = TICK_RATE
+        world_width = world_width or width
+        world_height = world_height or height
+        if replay is not None:
+            self.replay = Replay(replay)
+            seed = self.replay.seed
+            tick_rate = self.replay.tick_rate
+            world_width = self.replay.width
+            world_height = self.replay.height
 
-ENERGY_GUI_SIZE_MULTIPLIER = 0.5
+        # Pick a seed so the game can be recorded
+        if seed is None:
+            seed = random.randrange(2 ** 32)
 
-# variables controling the coin
-COIN_SPAWN_TIMER = 10
-START_COINS = 0
+        self.seed = seed
+        self.tick_rate = tick_rate
+        self.world_width = world_width
+        self.world_height = world_height
+        self.telemetry_output = telemetry_output
+        self.record_output = record
 
-# variables controling the fuel
-FUEL_SPAWN_TIMER = 10
-START_FUEL = 200
-FUEL_INCREMENT = 25
-FUEL_SPEED_FACTOR = 0.01
+        # The game objects and rules, made by setup_world()
+        self.world = None
 
-class MyGame(arcade.Window):
-    """
-    Main application class.
-    """
+        # Shows the part of the world around the player, and the HUD on top
+        self.camera = arcade.Camera(width, height)
+        self.gui_camera = arcade.Camera(width, height)
 
-    def __init__(self, width, height):
-        """
-        Initializer
-        """
+        # Steps the world at a fixed rate, whatever the frame rate
+        self.timestep = FixedTimestep(tick_rate=tick_rate, max_steps=MAX_STEPS_PER_FRAME)
 
-        # Call the parent class initializer
-        super().__init__(width, height)
+        # Shows fewer effects when frames take too long
+        self.quality = QualityGovernor()
+
+        # Seconds spent updating since the last frame was drawn
+        self.update_time = 0
+
+        # Frames drawn, for updating the HUD text every few frames
+        self.frames = 0
 
-        # Variable that will hold a list of shots fired by the player
-        self.player_shot_list = None
+        # Watches the sprite populations and memory while playing
+        self.telemetry = None
 
-        # Set up the player info
-        self.player_sprite = None
-        self.player_score = None
-        self.player_lives = None
+        # Writes the input of every step to a file
+        self.recorder = None
 
         # A list of connected joysticks for player control
         self.player_joysticks = []
 
-        self.wave_number = 0
+        # Turns the keyboard and joystick events into the input of a step
+        self.input = InputMapper()
+
+        # The life bars of the tanks
+        self.life_bars = None
+
+        # Text drawn on top of the game
+        self.hud = None
+        self.profiler_overlay = None
+
+        # Shown until the game is loaded
+        self.loading_text = arcade.Text(
+            "LOADING",
+            width / 2,
+            height / 2 + LOADING_BAR_HEIGHT,
+            arcade.color.WHITE,
+            font_size=20,
+            anchor_x="center"
+        )
+
+        # Set the background color
+        arcade.set_background_color(arcade.color.AMAZON)
+
+    def setup(self):
+        """
+        Start loading the game. The loading screen is shown until it is
+        loaded, one stage every frame.
+        """
+        self.startup.add_stage("world", self.setup_world)
+        self.startup.add_stage("first wave", self.setup_first_wave)
+        self.startup.add_stage("joysticks", self.setup_joysticks)
+        self.startup.add_stage("drawing", self.setup_drawing)
+        self.startup.start()
+
+    def setup_world(self):
+        """ Make the world and what watches it. """
+
+        # The game objects and rules
+        self.world = World(
+            self.world_width,
+            self.world_height,
+            profiler=self.profiler,
+            seed=self.seed,
+            view_width=self.width,
+            view_height=self.height
+        )
+
+        if self.telemetry_output is not None:
+            self.telemetry = Telemetry(
+                self.world,
+                output=self.telemetry_output,
+                tick_rate=self.tick_rate,
+                on_warning=lambda text: self.log.log("telemetry", text)
+            )
 
-        # Track the current state of what key is pressed
-        self.player_left_pressed = False
-        self.player_right_pressed = False
-        self.player_forward_pressed = False
-        self.player_backwards_pressed = False
+        if self.record_output is not None:
+            self.recorder = InputRecorder(
+                self.record_output, self.seed, self.tick_rate, self.world_width, self.world_height
+            )
 
-        self.canon_left_pressed = False
-        self.canon_right_pressed = False
+    def setup_first_wave(self):
+        """ Put the player and the first enemies in the world. """
 
-        # LifeBar Variables
-        self.life_bar_list = None
+        self.world.setup()
 
-        # the time for the coin spawn
-        self.coin_timer = COIN_SPAWN_TIMER
-        self.fuel_timer = FUEL_SPAWN_TIMER
+    def setup_joysticks(self):
+        """ Use the first two joysticks, if any. """
 
         # Get list of joysticks
         joysticks = arcade.get_joysticks()
 
         if joysticks:
-            print("Found {} joystick(s)".format(len(joysticks)))
+            self.log.log("joystick", "Found {} joystick(s)".format(len(joysticks)))
 
             if len(joysticks) >= 1:
               self.player_joysticks.append(joysticks[0])
@@ -126,323 +204,235 @@ class MyGame(arcade.Window):
                 j.push_handlers(self)
 
         else:
-            print("No joysticks found")
+            self.log.log("joystick", "No joysticks found")
 
+    def setup_drawing(self):
+        """ Set up what is drawn on top of the world. """
 
-        # Set the background color
-        arcade.set_background_color(arcade.color.AMAZON)
-
-    def setup(self):
-        """ Set up the game and initialize the variables. """
-
-        # No points when the game starts
-        self.player_score = 0
-
-        # No of lives
-        self.player_lives = PLAYER_LIVES
-
-        # Sprite lists
-        self.player_shot_list = arcade.SpriteList()
-        self.enemy_sprite_list = arcade.SpriteList()
-        self.explosion_sprite_list = arcade.SpriteList()
-        self.coin_sprite_list = arcade.SpriteList()
-        self.fuel_sprite_list = arcade.SpriteList()
-        self.tire_track_list = arcade.SpriteList()
-        self.life_bar_list = arcade.SpriteList()
-
-        # Create a Player object
-        self.player_sprite = Player(
-            energy=PLAYER_START_ENERGY,
-            center_x=PLAYER_START_X,
-            center_y=PLAYER_START_Y,
-            max_x=SCREEN_WIDTH,
-            max_y=SCREEN_HEIGHT,
-            max_energy=PLAYER_MAX_ENERGY,
-
-            scale=SPRITE_SCALING,
-            fuel=START_FUEL
-        )
-
-        self.canon_sprite = Canon(
-            target_sprite=self.player_sprite,
-            rotate_speed=CANON_ROTATE_SPEED,
-            scale=SPRITE_SCALING
-            )
-
-        # start wave_number
-        self.wave_number = self.start_new_wave(0)
-
-        # Create a LifeBar for the player and append it to the spritelist
-        l = LifeBar(
-            target_sprite=self.player_sprite,
+        # Create a LifeBar for the player
+        self.life_bars = LifeBars()
+        self.life_bars.add(
+            target_sprite=self.world.player_sprite,
             max_energy=PLAYER_MAX_ENERGY
         )
 
-        self.life_bar_list.append(l)
+        self.hud = Hud(color=arcade.color.WHITE)
+        self.hud.add_field("score", "SCORE: {}", 10, SCREEN_HEIGHT - 20)
+        self.hud.add_field("fuel", "fuel: {}", 10, SCREEN_HEIGHT - 40)
+        self.hud.add_field("coins", "COINS: {}", 10, SCREEN_HEIGHT - 60)
 
+        self.profiler_overlay = ProfilerOverlay(self.profiler, 10, SCREEN_HEIGHT - 90)
 
-    def start_new_wave(self, wave_no):
+    def draw_loading(self):
         """
-        creates new enemies on the screan
+        Draw the loading screen
         """
-        for i in range(BASE_NUMBER_OF_ENEMYS + wave_no):
-            e = Enemy(
-                max_x=SCREEN_WIDTH,
-                max_y=SCREEN_HEIGHT,
-                speed=ENEMY_MOVE_SPEED,
-                scale=SPRITE_SCALING,
-                target_sprite=self.player_sprite
-            )
-            self.enemy_sprite_list.append(e)
+        arcade.start_render()
+        self.loading_text.draw()
+
+        left = (self.width - LOADING_BAR_WIDTH) / 2
+        bottom = self.height / 2 - LOADING_BAR_HEIGHT
+        right = left + LOADING_BAR_WIDTH * self.startup.progress
+        arcade.draw_lrtb_rectangle_filled(left, right, bottom + LOADING_BAR_HEIGHT, bottom, arcade.color.WHITE)
+        arcade.draw_lrtb_rectangle_outline(
+            left, left + LOADING_BAR_WIDTH, bottom + LOADING_BAR_HEIGHT, bottom, arcade.color.WHITE
+        )
 
-        return wave_no + 1
+        self.startup.mark("loading screen")
 
     def on_draw(self):
         """
         Render the screen.
         """
+        if not self.startup.done:
+            self.draw_loading()
+            return
+
+        world = self.world
+        profiler = self.profiler
+        start = time.perf_counter()
 
         # This command has to happen before we start drawing
         arcade.start_render()
 
-        # Draw the Tire Tracks
-        self.tire_track_list.draw()
+        # Draw the world between the last two steps
+        world.interpolate(self.timestep.alpha)
 
-        # Draw the player shot
-        self.player_shot_list.draw()
-        self.explosion_sprite_list.draw()
+        # Follow the player
+        world.update_view()
+        self.camera.move(world.view[:2])
+        self.camera.use()
 
-        # Draw the player sprite
-        self.player_sprite.draw()
+        with profiler.phase("draw_ground"):
+            # Draw the Tire Tracks
+            world.tire_track_list.draw()
 
-        # Draw the canon
-        self.canon_sprite.draw()
+            # Draw the barricades
+            world.obstacles.draw()
 
-        # Draw coins
-        self.coin_sprite_list.draw()
+        with profiler.phase("draw_sprites"):
+            # Draw the player shot
+            world.player_shot_list.draw()
+            world.explosions.draw()
 
-        # Draw fuel
-        self.fuel_sprite_list.draw()
+            # Draw the player sprite
+            world.player_sprite.draw()
 
-        # Draw the enemy
-        self.enemy_sprite_list.draw()
+            # Draw the canon
+            world.canon_sprite.draw()
 
-        # Draw players score on screen
-        arcade.draw_text(
-            "SCORE: {}".format(self.player_score),  # Text to show
-            10,                  # X position
-            SCREEN_HEIGHT - 20,  # Y position
-            arcade.color.WHITE   # Color of text
-        )
+            # Draw coins
+            world.coin_sprite_list.draw()
 
-        # Draw players fuel on screen
-        arcade.draw_text(
-            "fuel: {}".format(int(self.player_sprite.fuel)),  # Text to show
-            10,                  # X position
-            SCREEN_HEIGHT - 40,  # Y position
-            arcade.color.WHITE   # Color of text
-        )
+            # Draw fuel
+            world.fuel_sprite_list.draw()
 
-        # Draw players coins on screen
-        arcade.draw_text(
-            "COINS: {}".format(self.player_sprite.coins),  # Text to show
-            10,                  # X position
-            SCREEN_HEIGHT - 60,  # Y position
-            arcade.color.WHITE   # Color of text
-        )
-        for lifebar in self.life_bar_list:
-            lifebar.draw()
+            # Draw the enemy
+            world.enemy_sprite_list.draw()
 
+        with profiler.phase("draw_hud"):
+            # Draw the life bars
+            self.life_bars.draw()
 
+            # The text does not move with the world
+            self.gui_camera.use()
 
-        # Draw players fuel on screen
-        arcade.draw_text(
-            "fuel: {}".format(int(self.player_sprite.fuel)),  # Text to show
-            10,                  # X position
-            SCREEN_HEIGHT - 40,  # Y position
-            arcade.color.WHITE   # Color of text
-        )
+            # Draw players score, fuel and coins on screen
+            if self.frames % self.quality.settings["hud_refresh_frames"] == 0:
+                self.hud.set("score", world.player_score)
+                self.hud.set("fuel", int(world.player_sprite.fuel))
+                self.hud.set("coins", world.player_sprite.coins)
+            self.hud.draw()
 
-        # Draw players coins on screen
-        arcade.draw_text(
-            "COINS: {}".format(self.player_sprite.coins),  # Text to show
-            10,                  # X position
-            SCREEN_HEIGHT - 60,  # Y position
-            arcade.color.WHITE   # Color of text
-        )
+        self.profiler_overlay.draw()
 
+        # Put the world back where the last step left it
+        world.interpolate(1.0)
 
+        profiler.end_frame()
+        if self.frames == 0:
+            self.startup.mark("first frame")
+            self.log.log("startup", self.startup.report())
+        self.frames += 1
+
+        # Show fewer effects if the frame took too long, more if there is time
+        work = self.update_time + time.perf_counter() - start
+        self.update_time = 0
+        if self.quality.frame(work * 1000):
+            world.apply_quality(self.quality.settings)
+
+    def get_input(self):
+        """
+        The state of the keyboard and joysticks as a PlayerInput, with the
+        presses since the last step
+        """
+        return self.input.snapshot()
 
     def on_update(self, delta_time):
         """
         Movement and game logic
         """
+        if not self.startup.done:
+            self.startup.update()
+            return
+
+        start = time.perf_counter()
+
+        for i in range(self.timestep.advance(delta_time)):
+            if self.replay is not None:
+                inputs = self.replay.inputs_at(self.world.ticks)
+            else:
+                inputs = self.get_input()
+
+            if self.recorder is not None:
+                self.recorder.record(inputs)
+
+            self.world.step(self.timestep.tick_time, inputs)
+
+            if self.telemetry is not None:
+                self.telemetry.tick()
 
-        # Timer for coin spawn
-        if self.coin_timer <= 0:
-            self.coin_sprite_list.append(Coin(SCREEN_WIDTH, SCREEN_HEIGHT))
-            self.coin_timer = COIN_SPAWN_TIMER
-        self.coin_timer -= delta_time
-
-        # Timer for fuel spawn
-        if self.fuel_timer <= 0:
-            self.fuel_sprite_list.append(Fuel(SCREEN_WIDTH, SCREEN_HEIGHT))
-            self.fuel_timer = FUEL_SPAWN_TIMER
-        self.fuel_timer -= delta_time
-
-        # fuel loss
-        if self.player_forward_pressed or self.player_backwards_pressed:
-            # looses fuel the more fuel you have
-            self.player_sprite.fuel -= delta_time * self.player_sprite.fuel / 100
-
-        # insure fuel is between 0 and 20
-        self.player_sprite.fuel = max(40, self.player_sprite.fuel)
-        self.player_sprite.fuel = min(100, self.player_sprite.fuel)
-
-        # Append new tire tracks randomly
-        if self.player_forward_pressed or self.player_backwards_pressed:
-            if random.randint(1, 5) == 1:
-                self.tire_track_list.append(TireTracks(target_sprite=self.player_sprite, lifetime_seconds=TIRETRACK_LIFETIME_SECONDS))
-
-        # Calculate player speed based on the keys pressed
-        self.player_sprite.change_x = 0
-
-        # Move player with keyboard
-        if self.player_left_pressed and not self.player_right_pressed:
-            self.player_sprite.angle += PLAYER_TURN_SPEED
-        if self.player_right_pressed and not self.player_left_pressed:
-            self.player_sprite.angle += -PLAYER_TURN_SPEED
-        if self.player_forward_pressed and not self.player_backwards_pressed:
-            self.player_sprite.forward(PLAYER_SPEED * (FUEL_SPEED_FACTOR * self.player_sprite.fuel))
-        if self.player_backwards_pressed and not self.player_forward_pressed:
-            self.player_sprite.forward(-PLAYER_SPEED * (FUEL_SPEED_FACTOR * self.player_sprite.fuel))
-
-        # Move player with joystick if present
-        # FIXME: Add players to a list and use i below
-        for i in range(len(self.player_joysticks)):
-            if round(self.player_joysticks[i].x) == -1:
-                self.player_sprite.angle += PLAYER_TURN_SPEED
-            if round(self.player_joysticks[i].x) == 1:
-                self.player_sprite.angle -= PLAYER_TURN_SPEED
-
-        # Update the sprites
-        self.player_sprite.update()
-        self.tire_track_list.on_update(delta_time)
-        self.player_shot_list.update()
-        self.explosion_sprite_list.on_update(delta_time)
-        self.enemy_sprite_list.on_update(delta_time)
-        self.canon_sprite.on_update(delta_time)
-
-        if self.canon_left_pressed:
-            self.canon_sprite.relative_angle += 5
-        elif self.canon_right_pressed:
-            self.canon_sprite.relative_angle -= 5
-
-        # checks for collisions between the player_shot and enemy sprite
-        for e in self.enemy_sprite_list:
-            for s in self.player_shot_list:
-                if arcade.check_for_collision(e, s):
-                    e.kill()
-                    s.kill()
-                    self.explosion_sprite_list.append(
-                        Explosion(position=e.position,scale=SPRITE_SCALING)
-                        )
-                    self.player_sprite.coins += 1
-
-        # checks for collisions between the player_sprite and coins
-        for c in self.coin_sprite_list:
-            if arcade.check_for_collision(c, self.player_sprite):
-                c.kill()
-                self.player_sprite.coins += 10
-
-        # checks for collisions between the player_sprite and fuel
-        for f in self.fuel_sprite_list:
-            if arcade.check_for_collision(f, self.player_sprite):
-                f.kill()
-                self.player_sprite.fuel += FUEL_INCREMENT
-
-        # loses life if you touch enemy
-        for e in self.enemy_sprite_list:
-            if arcade.check_for_collision(e, self.canon_sprite):
-                self.player_sprite.energy -= 1
-
-        # checks if the level has ended
-        if len(self.enemy_sprite_list) <= 0:
-            self.wave_number = self.start_new_wave(self.wave_number)
+        self.update_time += time.perf_counter() - start
 
     def on_key_press(self, key, modifiers):
         """
         Called whenever a key is pressed.
         """
+        action = self.input.key_press(key)
 
-        # Track state of arrow keys for the player
-        if key == PLAYER_KEY_FORWARD:
-            self.player_forward_pressed = True
-        elif key == PLAYER_KEY_BACKWARDS:
-            self.player_backwards_pressed = True
-        elif key == PLAYER_KEY_LEFT:
-            self.player_left_pressed = True
-        elif key == PLAYER_KEY_RIGHT:
-            self.player_right_pressed = True
-
-        if key == FIRE_KEY:
-            new_shot = PlayerShot(
-                position=self.player_sprite.position,
-                angle=self.canon_sprite.angle,
-                speed=PLAYER_SPEED,
-                scale=SPRITE_SCALING
-            )
-
-            self.player_shot_list.append(new_shot)
-
-        # Track state of arrow keys for the canon
-        if key == CANON_KEY_LEFT:
-            self.canon_left_pressed = True
-        elif key == CANON_KEY_RIGHT:
-            self.canon_right_pressed = True
+        if action == "profiler" and self.profiler_overlay is not None:
+            self.profiler_overlay.toggle()
 
     def on_key_release(self, key, modifiers):
         """
         Called whenever a key is released.
         """
+        self.input.key_release(key)
 
-        # player
-        if key == arcade.key.UP:
-            self.player_forward_pressed = False
-        elif key == arcade.key.DOWN:
-            self.player_backwards_pressed = False
-        elif key == arcade.key.LEFT:
-            self.player_left_pressed = False
-        elif key == arcade.key.RIGHT:
-            self.player_right_pressed = False
-
-        # canon
-        if key == CANON_KEY_LEFT:
-            self.canon_left_pressed = False
-        elif key == CANON_KEY_RIGHT:
-            self.canon_right_pressed = False
-
+    def on_close(self):
+        """
+        Called when the window is closed.
+        """
+        self.profiler.close()
+        if self.telemetry is not None:
+            self.telemetry.close()
+        if self.recorder is not None:
+            self.recorder.close()
+        self.log.close()
+        super().on_close()
 
     def on_joybutton_press(self, joystick, button_no):
-        print("Button pressed:", button_no, joystick)
-        # Press the fire key
-        self.on_key_press(FIRE_KEY, [])
+        action = self.input.button_press(joystick, button_no)
+        self.log.log("joystick button", "Button pressed: {} {}".format(button_no, action))
 
     def on_joybutton_release(self, joystick, button_no):
-        print("Button released:", button_no)
+        self.input.button_release(joystick, button_no)
+        self.log.log("joystick button", "Button released: {}".format(button_no))
 
     def on_joyaxis_motion(self, joystick, axis, value):
-        print("Joystick axis {}, value {}".format(axis, value))
+        self.input.axis_motion(joystick, axis, value)
+        self.log.log("joystick axis", "Joystick axis {}, value {}".format(axis, value))
 
     def on_joyhat_motion(self, joystick, hat_x, hat_y):
-        print("Joystick hat ({}, {})".format(hat_x, hat_y))
+        self.input.hat_motion(joystick, hat_x, hat_y)
+        self.log.log("joystick hat", "Joystick hat ({}, {})".format(hat_x, hat_y))
+
 
 def main():
     """
     Main method
     """
 
-    window = MyGame(SCREEN_WIDTH, SCREEN_HEIGHT)
+    parser = argparse.ArgumentParser(description="Tanks vs monsters")
+    parser.add_argument("--profile", metavar="FILE",
+                        help="Write the time of every frame phase to a .csv or .jsonl file")
+    parser.add_argument("--seed", type=int, help="Seed for the game, random if not given")
+    parser.add_argument("--record", metavar="FILE", help="Record the game to a file")
+    parser.add_argument("--replay", metavar="FILE", help="Play a recorded game")
+    parser.add_argument("--telemetry", metavar="FILE",
+                        help="Write sprite counts and memory use to a .jsonl file every second")
+    parser.add_argument("--world-size", metavar="WxH",
+                        help="Play in a world larger than the screen, like 4000x3000")
+    args = parser.parse_args()
+
+    world_width = world_height = None
+    if args.world_size:
+        try:
+            world_width, world_height = (int(v) for v in args.world_size.lower().split("x"))
+        except ValueError:
+            parser.error("--world-size must look like 4000x3000")
+
+    window = MyGame(
+        SCREEN_WIDTH,
+        SCREEN_HEIGHT,
+        profile_output=args.profile,
+        seed=args.seed,
+        record=args.record,
+        replay=args.replay,
+        world_width=world_width,
+        world_height=world_height,
+        telemetry_output=args.telemetry
+    )
     window.setup()
     arcade.run()
 
@@ -0,0 +1,210 @@
+"""
+The heads-up display drawn on top of the game.
+"""
+
+import arcade
+import pyglet
+
+
+class Hud:
+    """
+    Lines of text showing values from the game.
+
+    Every field keeps its own label, and the label is only laid out again
+    when the value shown in it changes. All labels are drawn as one batch.
+    """
+
+    def __init__(self, color=arcade.color.WHITE, font_size=12, font_name=("calibri", "arial")):
+        """
+        Setup new Hud object
+        """
+        self.color = arcade.get_four_byte_color(color)
+        self.font_size = font_size
+        self.font_name = font_name
+
+        self.batch = pyglet.graphics.Batch()
+
+        # The labels, templates and shown values by field name
+        self.labels = {}
+        self.templates = {}
+        self.values = {}
+
+    def add_field(self, name, template, x, y, value=None):
+        """
+        Add a line of text. The template is formatted with the value,
+        like "SCORE: {}".
+        """
+        self.templates[name] = template
+        self.values[name] = value
+        self.labels[name] = pyglet.text.Label(
+            template.format(value),
+            x=x,
+            y=y,
+            font_name=self.font_name,
+            font_size=self.font_size,
+            color=self.color,
+            batch=self.batch
+        )
+
+    def set(self, name, value):
+        """
+        Show a new value in a field
+        """
+        if self.values[name] != value:
+            self.values[name] = value
+            self.labels[name].text = self.templates[name].format(value)
+
+    def draw(self):
+        """
+        Draw all fields
+        """
+        # raw pyglet drawing needs this context helper inside arcade
+        with arcade.get_window().ctx.pyglet_rendering():
+            self.batch.draw()
+
+
+class LifeBar:
+    """
+    The energy of a sprite shown as a green bar on a red bar
+    """
+
+    def __init__(self, target_sprite, max_energy, size_multiplier=1, height=20, y_offset=30):
+        """
+        Setup new LifeBar object
+        """
+        self.target_sprite = target_sprite
+        self.max_energy = max_energy
+        self.size_multiplier = size_multiplier
+        self.bar_height = height
+        self.y_offset = y_offset
+
+        # The red bar behind and the green bar scaling with the energy
+        self.back = arcade.SpriteSolidColor(8, 8, arcade.color.RED)
+        self.front = arcade.SpriteSolidColor(8, 8, arcade.color.GREEN)
+
+        h = self.bar_height * self.size_multiplier
+        self.back.height = h
+        self.front.height = h
+        self.back.width = self.max_energy * self.size_multiplier
+
+        # The energy the green bar was last sized for
+        self.shown_energy = None
+
+    def update(self):
+        """
+        Follow the target and resize the green bar if the energy changed
+        """
+        x = self.target_sprite.center_x
+        y = self.target_sprite.center_y + self.y_offset
+        energy = self.target_sprite.energy
+
+        if energy != self.shown_energy:
+            self.shown_energy = energy
+            if energy > 0:
+                self.front.alpha = 255
+                self.front.width = energy * self.size_multiplier
+            else:
+                # A sprite can not have a width of zero
+                self.front.alpha = 0
+
+        self.back.position = (x, y)
+        self.front.position = (
+            x + (energy / 2 - (self.max_energy / 2)) * self.size_multiplier,
+            y
+        )
+
+
+class LifeBars:
+    """
+    The life bars of any number of sprites, drawn with one call
+    """
+
+    def __init__(self):
+        """
+        Setup new LifeBars object
+        """
+        self.bars = []
+        self.sprite_list = arcade.SpriteList()
+
+    def __len__(self):
+        return len(self.bars)
+
+    def add(self, target_sprite, max_energy, size_multiplier=1, height=20, y_offset=30):
+        """
+        Show a life bar above target_sprite
+        """
+        bar = LifeBar(
+            target_sprite=target_sprite,
+            max_energy=max_energy,
+            size_multiplier=size_multiplier,
+            height=height,
+            y_offset=y_offset
+        )
+        bar.update()
+        self.bars.append(bar)
+        self.sprite_list.append(bar.back)
+        self.sprite_list.append(bar.front)
+        return bar
+
+    def remove(self, target_sprite):
+        """
+        Stop showing the life bar of target_sprite
+        """
+        for bar in self.bars:
+            if bar.target_sprite is target_sprite:
+                self.bars.remove(bar)
+                bar.back.remove_from_sprite_lists()
+                bar.front.remove_from_sprite_lists()
+                return
+
+    def draw(self):
+        """
+        Update and draw all life bars
+        """
+        for bar in self.bars:
+            bar.update()
+
+        self.sprite_list.draw()
+
+
+class ProfilerOverlay:
+    """
+    The phase times of a FrameProfiler drawn on top of the game
+    """
+
+    def __init__(self, profiler, x, y, refresh_frames=30, line_height=16):
+        """
+        Setup new ProfilerOverlay object
+        """
+        self.profiler = profiler
+        self.x = x
+        self.y = y
+        self.refresh_frames = refresh_frames
+        self.line_height = line_height
+
+        self.visible = False
+        self.frames = 0
+        self.hud = Hud(color=arcade.color.YELLOW, font_size=10, font_name="courier")
+
+    def toggle(self):
+        """
+        Show or hide the overlay
+        """
+        self.visible = not self.visible
+
+    def draw(self):
+        """
+        Draw the overlay. The text is only renewed every refresh_frames.
+        """
+        if not self.visible:
+            return
+
+        if self.frames % self.refresh_frames == 0:
+            for i, line in enumerate(self.profiler.report()):
+                name = "line{}".format(i)
+                if name not in self.hud.labels:
+                    self.hud.add_field(name, "{}", self.x, self.y - i * self.line_height)
+                self.hud.set(name, line)
+        self.frames += 1
+
+        self.hud.draw()
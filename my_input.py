@@ -0,0 +1,180 @@
+"""
+Turns keyboard and joystick events into the input of every step.
+
+Keys, joystick buttons, axes and hats are mapped to named actions. The
+events only change which actions are held, they are not looked at until
+the next step of the world asks for a snapshot() of them. Any number of
+events between two steps then costs the same for the game, and a stick
+resting near the middle is ignored by a dead zone.
+"""
+
+import collections
+
+import arcade
+
+from my_replay import INPUT_FLAGS
+from my_world import PlayerInput
+
+
+# The actions of the keys
+KEY_ACTIONS = {
+    arcade.key.LEFT: "left",
+    arcade.key.RIGHT: "right",
+    arcade.key.UP: "forward",
+    arcade.key.DOWN: "backwards",
+    arcade.key.A: "canon_left",
+    arcade.key.D: "canon_right",
+    arcade.key.SPACE: "fire",
+    # Shows the time spent in each phase of a frame
+    arcade.key.F3: "profiler",
+}
+
+# The action of the joystick buttons without an action of their own
+JOYSTICK_BUTTON_ACTION = "fire"
+JOYSTICK_BUTTON_ACTIONS = {}
+
+# The actions of the joystick axes and hats, by name and direction
+JOYSTICK_AXIS_ACTIONS = {
+    ("x", -1): "left",
+    ("x", 1): "right",
+}
+JOYSTICK_HAT_ACTIONS = {
+    ("x", -1): "left",
+    ("x", 1): "right",
+    ("y", 1): "forward",
+    ("y", -1): "backwards",
+}
+
+# Axis values closer to the middle than this do nothing
+JOYSTICK_DEAD_ZONE = 0.5
+
+# Actions done once per press, holding them does not repeat them
+PRESS_ACTIONS = {"fire"}
+
+
+class InputMapper:
+    """
+    Keeps the actions held by the keyboard and joysticks
+    """
+
+    def __init__(self, key_actions=KEY_ACTIONS, button_actions=JOYSTICK_BUTTON_ACTIONS,
+                 button_action=JOYSTICK_BUTTON_ACTION, axis_actions=JOYSTICK_AXIS_ACTIONS,
+                 hat_actions=JOYSTICK_HAT_ACTIONS, dead_zone=JOYSTICK_DEAD_ZONE):
+        """
+        Setup new InputMapper object
+        """
+        self.key_actions = key_actions
+        self.button_actions = button_actions
+        self.button_action = button_action
+        self.axis_actions = axis_actions
+        self.hat_actions = hat_actions
+        self.dead_zone = dead_zone
+
+        # What holds every action down. A key and a stick can hold the same
+        # action, it is held until both let go.
+        self.held = collections.defaultdict(set)
+
+        # Actions pressed since the last snapshot
+        self.pressed = set()
+
+    def press(self, action, source):
+        """
+        Hold an action down. Returns the action.
+        """
+        if action is not None:
+            self.held[action].add(source)
+            self.pressed.add(action)
+        return action
+
+    def release(self, action, source):
+        """
+        Let go of an action. Returns the action.
+        """
+        if action is not None:
+            self.held[action].discard(source)
+        return action
+
+    def is_held(self, action):
+        """
+        True if anything holds the action down
+        """
+        return bool(self.held.get(action))
+
+    def key_press(self, key):
+        """
+        A key was pressed. Returns its action, if any.
+        """
+        return self.press(self.key_actions.get(key), ("key", key))
+
+    def key_release(self, key):
+        """
+        A key was released. Returns its action, if any.
+        """
+        return self.release(self.key_actions.get(key), ("key", key))
+
+    def button_press(self, joystick, button):
+        """
+        A joystick button was pressed. Returns its action, if any.
+        """
+        action = self.button_actions.get(button, self.button_action)
+        return self.press(action, (id(joystick), "button", button))
+
+    def button_release(self, joystick, button):
+        """
+        A joystick button was released. Returns its action, if any.
+        """
+        action = self.button_actions.get(button, self.button_action)
+        return self.release(action, (id(joystick), "button", button))
+
+    def direction(self, value):
+        """
+        -1, 0 or 1 for an axis value, 0 inside the dead zone
+        """
+        if value < -self.dead_zone:
+            return -1
+        if value > self.dead_zone:
+            return 1
+        return 0
+
+    def move(self, actions, source, name, direction):
+        """
+        Hold the action of a direction of an axis or hat, and let go of the
+        action of the other direction
+        """
+        for side in (-1, 1):
+            action = actions.get((name, side))
+            if side == direction:
+                # An axis sends many events while held, only the first
+                # one is a press
+                if action is not None and source not in self.held[action]:
+                    self.press(action, source)
+            else:
+                self.release(action, source)
+
+    def axis_motion(self, joystick, axis, value):
+        """
+        A joystick axis moved
+        """
+        self.move(self.axis_actions, (id(joystick), "axis", axis), axis, self.direction(value))
+
+    def hat_motion(self, joystick, hat_x, hat_y):
+        """
+        A joystick hat moved
+        """
+        self.move(self.hat_actions, (id(joystick), "hat", "x"), "x", hat_x)
+        self.move(self.hat_actions, (id(joystick), "hat", "y"), "y", hat_y)
+
+    def snapshot(self):
+        """
+        The input for the next step. An action pressed and released since
+        the last snapshot is still in it, so a short press is never lost.
+        """
+        flags = {}
+        for action in INPUT_FLAGS:
+            if action in PRESS_ACTIONS:
+                flags[action] = action in self.pressed
+            else:
+                flags[action] = self.is_held(action) or action in self.pressed
+
+        self.pressed.clear()
+        return PlayerInput(**flags)
@@ -0,0 +1,96 @@
+"""
+Diagnostics that never hold up a frame.
+
+Messages are put on a queue and written by a background thread, so the game
+never waits for the terminal. Every kind of message is rate limited: a
+joystick stick can send hundreds of events a second, only the first few
+each second are written and the rest are counted.
+"""
+
+import queue
+import sys
+import threading
+import time
+
+
+# Messages of one kind written per period, the rest are counted
+LOG_RATE_LIMIT = 5
+LOG_RATE_PERIOD = 1.0
+# Messages waiting to be written before new ones are dropped
+LOG_QUEUE_SIZE = 1000
+
+
+class BufferedLog(threading.Thread):
+    """
+    Writes rate limited messages to a stream from a background thread
+    """
+
+    def __init__(self, stream=None, rate_limit=LOG_RATE_LIMIT, rate_period=LOG_RATE_PERIOD,
+                 queue_size=LOG_QUEUE_SIZE, clock=time.monotonic):
+        """
+        Setup new BufferedLog object. The thread is started at once. Writes
+        to stdout if no stream is given.
+        """
+        super().__init__(daemon=True)
+        self.stream = stream
+        self.rate_limit = rate_limit
+        self.rate_period = rate_period
+        self.clock = clock
+        self.queue = queue.Queue(maxsize=queue_size)
+
+        # The start of the current period and the messages written and
+        # suppressed in it, by kind
+        self.periods = {}
+
+        # Messages lost because the queue was full
+        self.dropped = 0
+
+        self.start()
+
+    def log(self, kind, text):
+        """
+        Write a message of a kind, unless too many of that kind were written
+        recently. Never waits.
+        """
+        now = self.clock()
+        start, written, suppressed = self.periods.get(kind, (now, 0, 0))
+
+        if now - start >= self.rate_period:
+            # A new period, tell how many were left out of the last one
+            if suppressed:
+                text = "{} ({} more {} messages suppressed)".format(text, suppressed, kind)
+            start, written, suppressed = now, 0, 0
+
+        if written >= self.rate_limit:
+            self.periods[kind] = (start, written, suppressed + 1)
+            return
+
+        self.periods[kind] = (start, written + 1, suppressed)
+        try:
+            self.queue.put_nowait(text)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        """
+        Write what is queued and stop the thread
+        """
+        for kind, (start, written, suppressed) in self.periods.items():
+            if suppressed:
+                self.queue.put("({} more {} messages suppressed)".format(suppressed, kind))
+        self.periods.clear()
+        self.queue.put(None)
+        self.join()
+
+    def run(self):
+        stream = self.stream if self.stream is not None else sys.stdout
+        while True:
+            text = self.queue.get()
+            if text is None:
+                break
+            stream.write(text + "\n")
+
+            # Only flush when nothing more is waiting
+            if self.queue.empty():
+                stream.flush()
+        stream.flush()
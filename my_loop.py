@@ -0,0 +1,57 @@
+"""
+A fixed timestep for the game loop.
+
+The World is always stepped with the same delta_time, no matter how long a
+frame took. Frames that take longer run several steps to catch up, and the
+time left over is used to interpolate what is drawn between the last two
+steps.
+"""
+
+
+class FixedTimestep:
+    """
+    Turns the time between frames into a number of fixed steps
+    """
+
+    def __init__(self, tick_rate=60, max_steps=5):
+        """
+        Setup new FixedTimestep object
+        """
+        # Length of one step in seconds
+        self.tick_time = 1 / tick_rate
+
+        # Never run more steps than this in one frame. Without a limit a slow
+        # frame causes more steps, causing a slower frame and so on.
+        self.max_steps = max_steps
+
+        # Time not yet simulated
+        self.accumulator = 0
+
+        # Steps run in total
+        self.ticks = 0
+
+        # Time thrown away because a frame needed more than max_steps
+        self.dropped_time = 0
+
+    def advance(self, delta_time):
+        """
+        Add the time of a frame. Returns the number of steps to run.
+        """
+        self.accumulator += delta_time
+
+        steps = int(self.accumulator / self.tick_time)
+        if steps > self.max_steps:
+            self.dropped_time += (steps - self.max_steps) * self.tick_time
+            self.accumulator -= (steps - self.max_steps) * self.tick_time
+            steps = self.max_steps
+
+        self.accumulator -= steps * self.tick_time
+        self.ticks += steps
+        return steps
+
+    @property
+    def alpha(self):
+        """
+        How far we are between the last step and the next, from 0 to 1
+        """
+        return min(1.0, self.accumulator / self.tick_time)
@@ -0,0 +1,106 @@
+"""
+Barricades, sandbags and barrels placed from a level file.
+
+Obstacles never move. Their sprite list is static, so it is sent to the
+graphics card once, and they are put in a static part of the collision grid
+and in the blocked cells of the flow field once, when the level is loaded.
+Tanks and shots only test the obstacles in the cells they cover, and the
+monsters only look up the cell they are in, so the cost does not grow with
+the number of obstacles.
+"""
+
+import arcade
+
+from my_sprites import Obstacle, OBSTACLE_TEXTURES
+
+
+def load_level(filename, cell_size):
+    """
+    The obstacles of a level file as (kind, (x, y)). Lines starting with #
+    are comments.
+    """
+    with open(filename) as f:
+        lines = [line.rstrip("\n") for line in f if not line.startswith("#")]
+
+    obstacles = []
+    for row, line in enumerate(lines):
+        # The first line is the top of the world
+        y = (len(lines) - row - 0.5) * cell_size
+        for column, kind in enumerate(line):
+            if kind in OBSTACLE_TEXTURES:
+                obstacles.append((kind, ((column + 0.5) * cell_size, y)))
+
+    return obstacles
+
+
+class ObstacleLayer:
+    """
+    All the obstacles of a level
+    """
+
+    def __init__(self, collision_hash, flow_field, scale=1):
+        """
+        Setup new ObstacleLayer object
+        """
+        self.collision_hash = collision_hash
+        self.flow_field = flow_field
+        self.scale = scale
+
+        # Never changes after the level is loaded, so it is uploaded once
+        self.sprite_list = arcade.SpriteList(is_static=True)
+        self.collision_hash.register("obstacles", self.sprite_list, static=True)
+
+    def __len__(self):
+        return len(self.sprite_list)
+
+    def add(self, kind, position):
+        """
+        Put an obstacle in the world
+        """
+        obstacle = Obstacle(kind, position, scale=self.scale)
+        self.sprite_list.append(obstacle)
+        self.collision_hash.insert("obstacles", obstacle)
+        self.flow_field.block(*obstacle.box)
+        return obstacle
+
+    def load(self, filename, cell_size, max_x, max_y):
+        """
+        Add the obstacles of a level file that are inside the world
+        """
+        for kind, (x, y) in load_level(filename, cell_size):
+            if 0 <= x < max_x and 0 <= y < max_y:
+                self.add(kind, (x, y))
+
+    def blocks(self, sprite):
+        """
+        True if the sprite touches an obstacle
+        """
+        return bool(self.collision_hash.collisions_with_sprite(sprite, "obstacles"))
+
+    def push_out(self, sprite):
+        """
+        Move a sprite out of the obstacles it overlaps, the shortest way
+        """
+        for obstacle in self.collision_hash.nearby(sprite, "obstacles"):
+            left, bottom, right, top = obstacle.box
+
+            # How far the sprite is in the obstacle from each side
+            from_left = sprite.right - left
+            from_right = right - sprite.left
+            from_bottom = sprite.top - bottom
+            from_top = top - sprite.bottom
+            if min(from_left, from_right, from_bottom, from_top) <= 0:
+                continue
+
+            x = min(from_left, from_right)
+            y = min(from_bottom, from_top)
+            if x < y:
+                sprite.center_x += -from_left if from_left < from_right else from_right
+            else:
+                sprite.center_y += -from_bottom if from_bottom < from_top else from_top
+
+    def draw(self):
+        """
+        Draw all obstacles
+        """
+        self.sprite_list.draw()
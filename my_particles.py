@@ -0,0 +1,141 @@
+"""
+Short lived effects, like explosions, made of particles.
+
+A ParticleEmitter owns a fixed number of particle sprites in one sprite
+list, so it is drawn with a single draw call. Particles that are not alive
+are hidden and reused, the oldest first when all of them are alive. The
+position, scale and alpha of all particles are computed in one pass from
+how far through their lifetime they are, so the look does not depend on the
+frame rate and a burst of kills costs about the same as a single kill.
+"""
+
+import random
+
+import arcade
+import numpy as np
+
+
+class ParticleEmitter:
+    """
+    A fixed pool of particles that move, shrink and fade over their lifetime
+    """
+
+    def __init__(self, textures, capacity, lifetime, speed=0,
+                 start_scale=1.0, end_scale=0.0, start_alpha=255, end_alpha=0,
+                 rng=random):
+        """
+        Setup new ParticleEmitter object
+        """
+        # A new particle gets one of these, chosen at random
+        self.textures = textures
+
+        self.capacity = capacity
+
+        # Seconds a particle is alive
+        self.lifetime = lifetime
+
+        # Most pixels per second a particle moves away from where it started
+        self.speed = speed
+
+        self.start_scale = start_scale
+        self.end_scale = end_scale
+        self.start_alpha = start_alpha
+        self.end_alpha = end_alpha
+
+        self.rng = rng
+
+        # All particles, drawn together
+        self.sprite_list = arcade.SpriteList()
+        self.sprites = []
+        for i in range(capacity):
+            sprite = arcade.Sprite(texture=textures[0], scale=start_scale)
+            sprite.alpha = 0
+            self.sprites.append(sprite)
+            self.sprite_list.append(sprite)
+
+        # Where the next particle goes
+        self.next = 0
+
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.change_x = np.zeros(capacity)
+        self.change_y = np.zeros(capacity)
+
+        # Seconds since the particle was emitted
+        self.age = np.full(capacity, np.inf)
+
+        # Particles that were alive after the last update
+        self.alive = np.zeros(capacity, dtype=bool)
+
+    def __len__(self):
+        """
+        Number of particles alive
+        """
+        return int(np.count_nonzero(self.age < self.lifetime))
+
+    def emit(self, position, count=1):
+        """
+        Start count particles at position
+        """
+        x, y = position
+        for n in range(min(count, self.capacity)):
+            i = self.next
+            self.next = (i + 1) % self.capacity
+
+            angle = self.rng.uniform(0, 2 * np.pi)
+            speed = self.rng.uniform(0, self.speed)
+
+            self.x[i] = x
+            self.y[i] = y
+            self.change_x[i] = np.cos(angle) * speed
+            self.change_y[i] = np.sin(angle) * speed
+            self.age[i] = 0
+
+            sprite = self.sprites[i]
+            sprite.texture = self.textures[self.rng.randrange(len(self.textures))]
+            sprite.angle = self.rng.uniform(0, 360)
+            sprite.position = (x, y)
+            sprite.scale = self.start_scale
+            sprite.alpha = self.start_alpha
+            self.alive[i] = True
+
+    def on_update(self, delta_time):
+        """
+        Move, shrink and fade all particles
+        """
+        self.age += delta_time
+        alive = self.age < self.lifetime
+
+        # Only touch the particles that are alive or just died
+        active = np.flatnonzero(alive | self.alive)
+        self.alive = alive
+        if len(active) == 0:
+            return
+
+        self.x[active] += self.change_x[active] * delta_time
+        self.y[active] += self.change_y[active] * delta_time
+
+        # How far through its lifetime a particle is, 0 to 1
+        t = np.minimum(self.age[active] / self.lifetime, 1)
+        scale = self.start_scale + (self.end_scale - self.start_scale) * t
+        alpha = (self.start_alpha + (self.end_alpha - self.start_alpha) * t).astype(np.int32)
+        alpha[~alive[active]] = 0
+
+        sprites = self.sprites
+        for i, x, y, s, a in zip(
+            active.tolist(),
+            self.x[active].tolist(),
+            self.y[active].tolist(),
+            scale.tolist(),
+            alpha.tolist()
+        ):
+            sprite = sprites[i]
+            sprite.position = (x, y)
+            sprite.scale = s
+            sprite.alpha = a
+
+    def draw(self):
+        """
+        Draw all particles with one draw call
+        """
+        self.sprite_list.draw()
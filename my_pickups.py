@@ -0,0 +1,144 @@
+"""
+Coins, fuel and other things the player can pick up.
+
+Each type of pickup has a most number on the ground at once and a lifetime
+after which it disappears. New pickups are chosen from a weighted table.
+Pickups do not move, so they are kept in a static part of the collision
+grid and the player only looks at the pickups in the cells it covers.
+"""
+
+
+class PickupType:
+    """
+    A kind of pickup and the rules for it
+    """
+
+    def __init__(self, name, sprite_list, make_sprite, collect, capacity, lifetime, weight):
+        """
+        Setup new PickupType object
+        """
+        self.name = name
+
+        # The list the pickups are drawn from
+        self.sprite_list = sprite_list
+
+        # Function creating a new pickup sprite
+        self.make_sprite = make_sprite
+
+        # Function called with the player when a pickup is collected
+        self.collect = collect
+
+        # Most pickups of this type on the ground at once
+        self.capacity = capacity
+
+        # Seconds a pickup stays on the ground
+        self.lifetime = lifetime
+
+        # Chance of being chosen, relative to the other types
+        self.weight = weight
+
+        # The pickups on the ground and when they disappear, oldest first
+        self.expires = []
+
+
+class PickupManager:
+    """
+    Spawns, expires and collects pickups
+    """
+
+    def __init__(self, collision_hash, rng, spawn_time):
+        """
+        Setup new PickupManager object
+        """
+        self.collision_hash = collision_hash
+        self.rng = rng
+
+        # Seconds between spawns
+        self.spawn_time = spawn_time
+        self.spawn_timer = spawn_time
+
+        self.types = {}
+
+        # Time since the manager was created
+        self.time = 0
+
+    def add_type(self, pickup_type):
+        """
+        Add a kind of pickup to the spawn table
+        """
+        self.types[pickup_type.name] = pickup_type
+        self.collision_hash.register(pickup_type.name, pickup_type.sprite_list, static=True)
+
+    def __len__(self):
+        return sum(len(t.sprite_list) for t in self.types.values())
+
+    def spawn(self, name):
+        """
+        Put a pickup of a type on the ground, if there is room for it
+        """
+        pickup_type = self.types[name]
+        if len(pickup_type.sprite_list) >= pickup_type.capacity:
+            return None
+
+        sprite = pickup_type.make_sprite()
+        pickup_type.sprite_list.append(sprite)
+        pickup_type.expires.append((self.time + pickup_type.lifetime, sprite))
+        self.collision_hash.insert(name, sprite)
+        return sprite
+
+    def remove(self, name, sprite):
+        """
+        Take a pickup off the ground
+        """
+        pickup_type = self.types[name]
+        self.collision_hash.remove(name, sprite)
+        sprite.kill()
+        pickup_type.expires = [e for e in pickup_type.expires if e[1] is not sprite]
+
+    def choose(self):
+        """
+        A type with room for more pickups, chosen by weight
+        """
+        candidates = [
+            t for t in self.types.values()
+            if len(t.sprite_list) < t.capacity and t.weight > 0
+        ]
+        if not candidates:
+            return None
+
+        pick = self.rng.uniform(0, sum(t.weight for t in candidates))
+        for t in candidates:
+            pick -= t.weight
+            if pick <= 0:
+                return t.name
+        return candidates[-1].name
+
+    def update(self, delta_time):
+        """
+        Remove expired pickups and spawn new ones
+        """
+        self.time += delta_time
+
+        for name, pickup_type in self.types.items():
+            expires = pickup_type.expires
+            while expires and expires[0][0] <= self.time:
+                expire_time, sprite = expires.pop(0)
+                self.collision_hash.remove(name, sprite)
+                sprite.kill()
+
+        # Timer for pickup spawn
+        if self.spawn_timer <= 0:
+            name = self.choose()
+            if name is not None:
+                self.spawn(name)
+            self.spawn_timer = self.spawn_time
+        self.spawn_timer -= delta_time
+
+    def collect(self, player):
+        """
+        Give the player the pickups it touches
+        """
+        for name, pickup_type in self.types.items():
+            for sprite in self.collision_hash.collisions_with_sprite(player, name):
+                self.remove(name, sprite)
+                pickup_type.collect(player)
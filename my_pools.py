@@ -0,0 +1,191 @@
+"""
+Pools of sprites that are reused instead of created again and again.
+"""
+
+from my_sprites import PlayerShot, Enemy
+
+
+class ShotPool:
+    """
+    Recycles the shots fired by the player.
+
+    A shot returns to the pool when it is killed, either because it hit
+    something, left the screen or flew further than max_range.
+    """
+
+    def __init__(self, sprite_list, max_x, max_y, max_range, scale=1, size=0):
+        """
+        Setup new ShotPool object
+        """
+        # The list active shots are added to
+        self.sprite_list = sprite_list
+
+        self.max_x = max_x
+        self.max_y = max_y
+        self.max_range = max_range
+        self.scale = scale
+
+        # Shots ready to be fired again
+        self.free = []
+
+        # Number of shots ever created by the pool
+        self.created = 0
+
+        # The most shots that have been active at the same time
+        self.high_water = 0
+
+        for i in range(size):
+            self.free.append(self._create())
+
+    def _create(self):
+        """
+        A new shot belonging to the pool
+        """
+        shot = PlayerShot(
+            position=(0, 0),
+            angle=0,
+            speed=0,
+            max_x=self.max_x,
+            max_y=self.max_y,
+            max_range=self.max_range,
+            scale=self.scale
+        )
+        shot.pool = self
+        self.created += 1
+        return shot
+
+    @property
+    def active(self):
+        """
+        Number of shots flying right now
+        """
+        return len(self.sprite_list)
+
+    def fire(self, position, angle, speed):
+        """
+        Take a shot from the pool and fire it
+        """
+        if self.free:
+            shot = self.free.pop()
+        else:
+            shot = self._create()
+
+        shot.reset(position, angle, speed)
+        self.sprite_list.append(shot)
+        self.high_water = max(self.high_water, self.active)
+        return shot
+
+    def release(self, shot):
+        """
+        Put a shot back in the pool. Called when the shot is killed.
+        """
+        self.free.append(shot)
+
+    def stats(self):
+        """
+        The size and use of the pool
+        """
+        return {
+            "created": self.created,
+            "free": len(self.free),
+            "active": self.active,
+            "high_water": self.high_water,
+        }
+
+
+class EnemyPool:
+    """
+    Keeps dead enemies so they can be used again in the next wave
+    """
+
+    def __init__(self, scale=1):
+        """
+        Setup new EnemyPool object
+        """
+        self.scale = scale
+
+        # Enemies ready to be spawned
+        self.free = []
+
+        # Number of enemies ever created by the pool
+        self.created = 0
+
+    def create(self, count=1):
+        """
+        Create enemies ahead of time, so spawning them later is cheap
+        """
+        for i in range(count):
+            enemy = Enemy(scale=self.scale)
+            enemy.pool = self
+            self.free.append(enemy)
+            self.created += 1
+
+    def acquire(self):
+        """
+        An enemy from the pool, created if the pool is empty
+        """
+        if not self.free:
+            self.create()
+        return self.free.pop()
+
+    def release(self, enemy):
+        """
+        Put an enemy back in the pool. Called when the enemy dies.
+        """
+        self.free.append(enemy)
+
+
+class SpawnScheduler:
+    """
+    Spreads the spawning of a wave over several ticks.
+
+    No more than per_tick enemies are spawned in one tick. While the wave
+    is being fought, the pool is filled a little every tick with the
+    enemies the next wave will need.
+    """
+
+    def __init__(self, pool, sprite_list, swarm, max_x, max_y, speed, rng,
+                 per_tick=4, prewarm_per_tick=2):
+        """
+        Setup new SpawnScheduler object
+        """
+        self.pool = pool
+        self.sprite_list = sprite_list
+        self.swarm = swarm
+        self.max_x = max_x
+        self.max_y = max_y
+        self.speed = speed
+        self.rng = rng
+
+        self.per_tick = per_tick
+        self.prewarm_per_tick = prewarm_per_tick
+
+        # Enemies still to spawn in this wave
+        self.pending = 0
+
+        # The number of enemies the pool should hold before the next wave
+        self.prewarm_target = 0
+
+    def queue(self, count, next_count=0):
+        """
+        Spawn count enemies over the next ticks and get ready for a wave
+        of next_count enemies
+        """
+        self.pending += count
+        self.prewarm_target = next_count
+
+    def update(self):
+        """
+        Spawn the enemies of this tick and pre-warm the pool
+        """
+        for i in range(min(self.pending, self.per_tick)):
+            e = self.pool.acquire()
+            e.reset(self.max_x, self.max_y, self.rng)
+            self.sprite_list.append(e)
+            self.swarm.add(e, speed=self.speed)
+        self.pending -= min(self.pending, self.per_tick)
+
+        if self.pending == 0:
+            missing = self.prewarm_target - len(self.pool.free) - len(self.sprite_list)
+            if missing > 0:
+                self.pool.create(min(missing, self.prewarm_per_tick))
@@ -0,0 +1,182 @@
+"""
+Times the named phases of each frame.
+
+Code to measure is wrapped in `with profiler.phase("name"):`. The profiler
+keeps the times of the last frames for percentiles and can stream every
+frame to a CSV or JSONL file. The file is written by a background thread,
+so the game loop never waits for the disk.
+"""
+
+import collections
+import json
+import queue
+import threading
+import time
+
+
+class _Phase:
+    """
+    Context manager adding the time spent inside it to a phase
+    """
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        frame = self.profiler.frame
+        frame[self.name] = frame.get(self.name, 0) + time.perf_counter() - self.start
+        return False
+
+
+class _NoPhase:
+    """
+    Context manager doing nothing, used when the profiler is off
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_PHASE = _NoPhase()
+
+
+class FrameWriter(threading.Thread):
+    """
+    Writes frame times to a file from a background thread
+    """
+
+    def __init__(self, filename):
+        """
+        Setup new FrameWriter object. JSONL is written if the file name
+        ends with .jsonl, else CSV.
+        """
+        super().__init__(daemon=True)
+        self.filename = filename
+        self.jsonl = filename.endswith(".jsonl")
+        self.queue = queue.Queue()
+
+    def put(self, frame_no, frame):
+        """
+        Queue the times of a frame for writing
+        """
+        self.queue.put((frame_no, frame))
+
+    def close(self):
+        """
+        Write what is queued and stop the thread
+        """
+        self.queue.put(None)
+        self.join()
+
+    def run(self):
+        with open(self.filename, "w") as f:
+            if not self.jsonl:
+                f.write("frame,phase,ms\n")
+
+            while True:
+                item = self.queue.get()
+                if item is None:
+                    break
+
+                frame_no, frame = item
+                if self.jsonl:
+                    f.write(json.dumps({
+                        "frame": frame_no,
+                        "ms": {name: t * 1000 for name, t in frame.items()}
+                    }) + "\n")
+                else:
+                    for name, t in frame.items():
+                        f.write("{},{},{:.4f}\n".format(frame_no, name, t * 1000))
+
+
+class FrameProfiler:
+    """
+    Times named phases and keeps the times of the last frames
+    """
+
+    def __init__(self, enabled=True, history=120, output=None):
+        """
+        Setup new FrameProfiler object
+        """
+        self.enabled = enabled
+
+        # Phase times of the frame being measured, in seconds
+        self.frame = {}
+        self.frame_no = 0
+
+        # The times of the last frames by phase
+        self.history = history
+        self.times = {}
+
+        # Streams all frames to a file
+        self.writer = None
+        if output is not None:
+            self.writer = FrameWriter(output)
+            self.writer.start()
+
+    def phase(self, name):
+        """
+        A context manager timing a phase of the frame
+        """
+        if not self.enabled:
+            return _NO_PHASE
+        return _Phase(self, name)
+
+    def end_frame(self):
+        """
+        Finish the frame being measured and start a new one
+        """
+        if not self.enabled:
+            return
+
+        frame = self.frame
+        self.frame = {}
+        self.frame_no += 1
+
+        for name, t in frame.items():
+            if name not in self.times:
+                self.times[name] = collections.deque(maxlen=self.history)
+            self.times[name].append(t)
+
+        if self.writer is not None:
+            self.writer.put(self.frame_no, frame)
+
+    def percentiles(self, name, ps=(50, 95, 99)):
+        """
+        Percentiles of the recent times of a phase, in milliseconds
+        """
+        ordered = sorted(self.times.get(name, ()))
+        if not ordered:
+            return [0 for p in ps]
+
+        return [
+            ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] * 1000
+            for p in ps
+        ]
+
+    def report(self):
+        """
+        A line of text for every phase
+        """
+        lines = []
+        for name in self.times:
+            p50, p95, p99 = self.percentiles(name)
+            lines.append("{:<16} p50 {:6.2f}  p95 {:6.2f}  p99 {:6.2f} ms".format(name, p50, p95, p99))
+        return lines
+
+    def close(self):
+        """
+        Finish writing the file, if any
+        """
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
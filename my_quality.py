@@ -0,0 +1,111 @@
+"""
+Trades looks for speed when frames take too long.
+
+The QualityGovernor is given the time the game spent on every frame. When
+the recent frames are over budget it steps down one quality level, and when
+they have been well under budget for a while it steps back up. A level only
+changes the things that are there to look at: how many tire tracks are left,
+how long they stay, how many particles an explosion has and how often the
+HUD text is updated. The rules of the game are never touched, so a recorded
+game plays the same at every level.
+"""
+
+import collections
+
+
+# The quality levels, best first
+QUALITY_LEVELS = [
+    dict(track_spawn_factor=1.0, track_lifetime_factor=1.0, explosion_particles=3, hud_refresh_frames=1),
+    dict(track_spawn_factor=0.5, track_lifetime_factor=0.6, explosion_particles=2, hud_refresh_frames=2),
+    dict(track_spawn_factor=0.25, track_lifetime_factor=0.35, explosion_particles=1, hud_refresh_frames=4),
+    dict(track_spawn_factor=0.0, track_lifetime_factor=0.2, explosion_particles=1, hud_refresh_frames=8),
+]
+
+# Milliseconds of work allowed per frame
+QUALITY_FRAME_BUDGET_MS = 12
+# Frames the average frame time is taken over
+QUALITY_WINDOW = 30
+# Quality goes up again when the frames are below this part of the budget
+QUALITY_RESTORE_RATIO = 0.6
+# Frames in a row below the restore line before quality goes up
+QUALITY_RESTORE_FRAMES = 180
+# Frames after a change before the next one
+QUALITY_COOLDOWN_FRAMES = 60
+
+
+class QualityGovernor:
+    """
+    Picks a quality level from the recent frame times
+    """
+
+    def __init__(self, budget_ms=QUALITY_FRAME_BUDGET_MS, levels=QUALITY_LEVELS,
+                 window=QUALITY_WINDOW, restore_ratio=QUALITY_RESTORE_RATIO,
+                 restore_frames=QUALITY_RESTORE_FRAMES, cooldown_frames=QUALITY_COOLDOWN_FRAMES):
+        """
+        Setup new QualityGovernor object
+        """
+        self.budget_ms = budget_ms
+        self.levels = levels
+        self.restore_ratio = restore_ratio
+        self.restore_frames = restore_frames
+        self.cooldown_frames = cooldown_frames
+
+        # Index in levels, 0 is the best quality
+        self.level = 0
+
+        self.times = collections.deque(maxlen=window)
+
+        # Frames in a row below the restore line
+        self.good_frames = 0
+
+        # Frames until the level may change again
+        self.cooldown = 0
+
+        # Number of times the level went down and up
+        self.drops = 0
+        self.raises = 0
+
+    @property
+    def settings(self):
+        """
+        The settings of the current level
+        """
+        return self.levels[self.level]
+
+    def frame(self, ms):
+        """
+        Add the time of a frame. Returns True if the level changed.
+        """
+        self.times.append(ms)
+        if self.cooldown > 0:
+            self.cooldown -= 1
+
+        average = sum(self.times) / len(self.times)
+        if average < self.budget_ms * self.restore_ratio:
+            self.good_frames += 1
+        else:
+            self.good_frames = 0
+
+        if self.cooldown > 0 or len(self.times) < self.times.maxlen:
+            return False
+
+        if average > self.budget_ms and self.level < len(self.levels) - 1:
+            self.set_level(self.level + 1)
+            self.drops += 1
+            return True
+
+        if self.good_frames >= self.restore_frames and self.level > 0:
+            self.set_level(self.level - 1)
+            self.raises += 1
+            return True
+
+        return False
+
+    def set_level(self, level):
+        """
+        Change to a level and wait before changing again
+        """
+        self.level = level
+        self.cooldown = self.cooldown_frames
+        self.good_frames = 0
+        self.times.clear()
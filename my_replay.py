@@ -0,0 +1,171 @@
+"""
+Records the inputs of a game and plays them back.
+
+A World started from the same seed and stepped with the same inputs and the
+same delta_time plays exactly the same game. A recording is the seed, the
+tick rate and the input of every tick, run-length encoded, since the input
+often stays the same for many ticks.
+
+Replay a recording as fast as possible without a window:
+    python my_replay.py game.rec
+"""
+import argparse
+import struct
+import time
+
+from my_world import World, PlayerInput
+
+
+# Start of every recording
+REPLAY_MAGIC = b"TVMR"
+REPLAY_VERSION = 6
+
+# magic, version, seed, tick rate, world width, world height
+HEADER = struct.Struct("<4sBQdII")
+
+# number of ticks, input bits
+RUN = struct.Struct("<HB")
+
+# The PlayerInput flags in the order of their bits
+INPUT_FLAGS = ("left", "right", "forward", "backwards", "canon_left", "canon_right", "fire")
+
+
+def pack_input(inputs):
+    """
+    A PlayerInput as an int with a bit per flag
+    """
+    bits = 0
+    for i, name in enumerate(INPUT_FLAGS):
+        if getattr(inputs, name):
+            bits |= 1 << i
+    return bits
+
+
+def unpack_input(bits):
+    """
+    A PlayerInput from an int with a bit per flag
+    """
+    return PlayerInput(**{name: bool(bits & (1 << i)) for i, name in enumerate(INPUT_FLAGS)})
+
+
+class InputRecorder:
+    """
+    Writes the input of every tick to a file
+    """
+
+    def __init__(self, filename, seed, tick_rate, width, height):
+        """
+        Setup new InputRecorder object
+        """
+        self.file = open(filename, "wb")
+        self.file.write(HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, seed, tick_rate, width, height))
+
+        # The input being repeated and for how many ticks
+        self.bits = None
+        self.count = 0
+        self.ticks = 0
+
+    def record(self, inputs):
+        """
+        Add the input of a tick
+        """
+        bits = pack_input(inputs)
+        if bits == self.bits and self.count < 0xFFFF:
+            self.count += 1
+        else:
+            self._flush()
+            self.bits = bits
+            self.count = 1
+        self.ticks += 1
+
+    def _flush(self):
+        if self.count:
+            self.file.write(RUN.pack(self.count, self.bits))
+
+    def close(self):
+        """
+        Write the last run and close the file
+        """
+        self._flush()
+        self.count = 0
+        self.file.close()
+
+
+class Replay:
+    """
+    A recording read back from a file
+    """
+
+    def __init__(self, filename):
+        """
+        Setup new Replay object
+        """
+        with open(filename, "rb") as f:
+            data = f.read()
+
+        magic, version, self.seed, self.tick_rate, self.width, self.height = HEADER.unpack_from(data)
+        if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+            raise ValueError("{} is not a version {} recording".format(filename, REPLAY_VERSION))
+
+        # The input bits of every tick
+        self.inputs = []
+        for count, bits in RUN.iter_unpack(data[HEADER.size:]):
+            self.inputs.extend([bits] * count)
+
+    def __len__(self):
+        return len(self.inputs)
+
+    def make_world(self, **kwargs):
+        """
+        A World set up like the recorded one
+        """
+        world = World(self.width, self.height, seed=self.seed, **kwargs)
+        world.setup()
+        return world
+
+    def inputs_at(self, tick):
+        """
+        The PlayerInput of a tick. No input after the recording ends.
+        """
+        if tick < len(self.inputs):
+            return unpack_input(self.inputs[tick])
+        return PlayerInput()
+
+    def run(self, world=None):
+        """
+        Play the whole recording as fast as possible. Returns the world.
+        """
+        if world is None:
+            world = self.make_world()
+
+        delta_time = 1 / self.tick_rate
+        for bits in self.inputs:
+            world.step(delta_time, unpack_input(bits))
+
+        return world
+
+
+def main():
+    """
+    Main method
+    """
+    parser = argparse.ArgumentParser(description="Replay a recorded game without a window")
+    parser.add_argument("recording", help="File written by my_game.py --record")
+    args = parser.parse_args()
+
+    replay = Replay(args.recording)
+
+    start = time.perf_counter()
+    world = replay.run()
+    elapsed = time.perf_counter() - start
+
+    print("ticks: {}  seconds: {:.2f}  ticks per second: {:.0f}".format(
+        len(replay), elapsed, len(replay) / elapsed if elapsed else 0
+    ))
+    print("wave: {}  coins: {}  energy: {:.1f}  fuel: {:.1f}".format(
+        world.wave_number, world.player_sprite.coins, world.player_sprite.energy, world.player_sprite.fuel
+    ))
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,65 @@ import random
 
 import arcade
 
+from my_textures import textures
+
+
+# The textures used by the sprites, with the flips they need
+PLAYER_TEXTURE = dict(
+    filename="images/sprites/tankBody_sand.png",
+    flipped_diagonally=True,
+    flipped_horizontally=True
+)
+TIRETRACKS_TEXTURE = dict(
+    filename="images/sprites/tracksSmall.png",
+    flipped_diagonally=True,
+    flipped_horizontally=True
+)
+CANON_TEXTURE = dict(
+    filename="images/sprites/tankDark_barrel1.png",
+    flipped_diagonally=True,
+    flipped_horizontally=True
+)
+COIN_TEXTURE = dict(filename="images/sprites/tankSand_barrel3_outline.png")
+FUEL_TEXTURE = dict(filename="images/sprites/barrelRed_side.png")
+ENEMY_TEXTURE = dict(
+    filename="images/sprites/barrelBlack_top.png",
+    flipped_horizontally=True
+)
+EXPLOSION_TEXTURES = [
+    dict(filename=f"images/sprites/explosion{type}.png") for type in range(1, 6)
+]
+PLAYERSHOT_TEXTURE = dict(
+    filename="images/sprites/bulletSand1.png",
+    flipped_diagonally=True,
+    flipped_horizontally=True
+)
+# The obstacles, by the character used for them in level files
+OBSTACLE_TEXTURES = {
+    "M": dict(filename="images/sprites/barricadeMetal.png"),
+    "W": dict(filename="images/sprites/barricadeWood.png"),
+    "S": dict(filename="images/sprites/sandbagBrown.png"),
+    "B": dict(filename="images/sprites/barrelGreen_side.png"),
+}
+
+SPRITE_TEXTURES = [
+    PLAYER_TEXTURE,
+    TIRETRACKS_TEXTURE,
+    CANON_TEXTURE,
+    COIN_TEXTURE,
+    FUEL_TEXTURE,
+    ENEMY_TEXTURE,
+    PLAYERSHOT_TEXTURE,
+] + EXPLOSION_TEXTURES + list(OBSTACLE_TEXTURES.values())
+
+
+def preload_textures():
+    """
+    Load all textures used by the sprites, so creating a sprite never
+    loads an image
+    """
+    textures.preload(SPRITE_TEXTURES)
+
 
 class Player(arcade.Sprite):
     """
@@ -29,10 +88,7 @@ class Player(arcade.Sprite):
         super().__init__(
             center_x=center_x,
             center_y=center_y,
-            filename="images/sprites/tankBody_sand.png",
-            flipped_diagonally=True,
-            flipped_horizontally=True,
-            flipped_vertically=False,
+            texture=textures.get(**PLAYER_TEXTURE),
             scale=scale
         )
 
@@ -54,50 +110,54 @@ class Player(arcade.Sprite):
         # makes sure energy doesn't go under zero
         self.energy = max(self.energy, 0)
 
-        # Don't let the player move off screen
-        # FIXME: What about the y axis?
+        # Don't let the player move out of the world
         if self.left < 0:
             self.left = 0
         elif self.right > self.max_x - 1:
             self.right = self.max_x - 1
 
+        if self.bottom < 0:
+            self.bottom = 0
+        elif self.top > self.max_y - 1:
+            self.top = self.max_y - 1
+
 class TireTracks(arcade.Sprite):
     """
-    The player
+    Tracks left by the tanks. They are placed and faded by a DecalRing,
+    see my_decals.py
     """
 
-    def __init__(self, target_sprite, scale=1, lifetime_seconds=10):
+    def __init__(self, scale=1):
         """
         Setup new TireTrack object
         """
-        self.lifetime_seconds = lifetime_seconds
-        self.fade_timer = self.lifetime_seconds
 
         # Call init() on the class we inherited from
         super().__init__(
-            center_x=target_sprite.center_x,
-            center_y=target_sprite.center_y,
-            angle=target_sprite.angle,
-            filename="images/sprites/tracksSmall.png",
-            flipped_diagonally=True,
-            flipped_horizontally=True,
-            flipped_vertically=False,
+            texture=textures.get(**TIRETRACKS_TEXTURE),
             scale=scale
         )
 
-    def on_update(self, delta_time):
 
-        # Starts to fade when only half of the lifetime is left
-        if self.fade_timer <= self.lifetime_seconds / 2:
-            # Makes sure fade_timer doesn't go under 0
-            self.fade_timer = max(0, self.fade_timer)
-            # Multiplies alpha by time left to make it fade away
-            self.alpha *= (self.fade_timer / (self.lifetime_seconds / 2))
-        self.fade_timer -= delta_time
+class Obstacle(arcade.Sprite):
+    """
+    Something in the way of tanks, shots and monsters. Obstacles never
+    move, so the box they block is computed once.
+    """
 
-        # deletes track if invisible
-        if self.alpha <= 0:
-            self.kill()
+    def __init__(self, kind, position, scale=1):
+        """
+        Setup new Obstacle object
+        """
+        super().__init__(
+            texture=textures.get(**OBSTACLE_TEXTURES[kind]),
+            scale=scale
+        )
+        self.kind = kind
+        self.position = position
+
+        # left, bottom, right, top
+        self.box = (self.left, self.bottom, self.right, self.top)
 
 
 class Canon(arcade.Sprite):
@@ -106,7 +166,7 @@ class Canon(arcade.Sprite):
 
         # canon always locks to a chosen sprite
         self.target_sprite = target_sprite
-        self.image = "images/sprites/tankDark_barrel1.png"
+        self.image = CANON_TEXTURE["filename"]
 
         self.canon_rotate_speed = rotate_speed
         # angle relative to target sprite
@@ -114,11 +174,8 @@ class Canon(arcade.Sprite):
 
 
         super().__init__(
-            filename=self.image,
-            scale=scale,
-            flipped_diagonally=True,
-            flipped_horizontally=True,
-            flipped_vertically=False
+            texture=textures.get(**CANON_TEXTURE),
+            scale=scale
         )
 
     def on_update(self, delta_time):
@@ -128,136 +185,108 @@ class Canon(arcade.Sprite):
 
 class Coin(arcade.Sprite):
 
-    def __init__(self, max_x, max_y):
+    def __init__(self, max_x, max_y, rng=random):
 
         super().__init__(
-            center_x=random.randint(1, max_x),
-            center_y=random.randint(1, max_y),
-            filename="images/sprites/tankSand_barrel3_outline.png"
+            center_x=rng.randint(1, max_x),
+            center_y=rng.randint(1, max_y),
+            texture=textures.get(**COIN_TEXTURE)
         )
 
 class Fuel(arcade.Sprite):
 
-    def __init__(self, max_x, max_y):
+    def __init__(self, max_x, max_y, rng=random):
 
 
         super().__init__(
-            center_y=random.randint(1,max_x),
-            center_x=random.randint(1,max_y),
-            filename="images/sprites/barrelRed_side.png"
+            center_x=rng.randint(1, max_x),
+            center_y=rng.randint(1, max_y),
+            texture=textures.get(**FUEL_TEXTURE)
         )
 
 class Enemy(arcade.Sprite):
-    def __init__(self, target_sprite, scale, max_x, max_y, speed):
-        self.image = "images/sprites/barrelBlack_top.png"
-
-        self.max_x = max_x
-        self.max_y = max_y
-        self.speed = speed
-
-
-        super().__init__(
-            filename=self.image,
-            scale=scale,
-            flipped_diagonally=False,
-            flipped_horizontally=True,
-            flipped_vertically=False
-        )
-        self.target_sprite = target_sprite
-
-        self.center_x = random.randint(0, max_x)
-        self.center_y = random.randint(0, max_y)
-
-        self.angle = random.randint(0, 360)
-
-    def on_update(self, delta_time):
-        """
-        Move the sprite
-        """
-        # makes the enemy follow the player
-        self.angle = arcade.get_angle_degrees(
-            self.center_x,
-            self.center_y,
-            self.target_sprite.center_x,
-            self.target_sprite.center_y
-        )
-        # resets change_x and y because .forward() only adjusts change_x and y
-        self.stop()
-        self.forward(self.speed)
-        # get_angle_degrees doesn't give the output we expected but if you swap change_x and change_y it does
-        self.change_x, self.change_y = self.change_y, self.change_x
-
-        # Update the position
-        self.center_x += self.change_x * delta_time
-        self.center_y += self.change_y * delta_time
+    """
+    A monster. Enemies are moved by an EnemySwarm, see my_swarm.py, which
+    also keeps their speed. Dead enemies are reused by an EnemyPool,
+    see my_pools.py
+    """
 
-        if self.right > self.max_x:
-            self.kill()
-        elif self.left < 0:
-            self.kill()
+    def __init__(self, scale):
+        self.image = ENEMY_TEXTURE["filename"]
 
-        if self.bottom > self.max_y:
-            self.kill()
-        elif self.top < 0:
-            self.kill()
+        # The swarm moving the enemy and its place in the swarm
+        self.swarm = None
+        self.entity_index = None
 
-class Explosion(arcade.Sprite):
-    """
-    An animated explosion.
-    """
+        # The pool the enemy returns to when it dies
+        self.pool = None
 
-    def __init__(self, position, scale, lifetime=1.0, start_size=0.01):
-        type = random.randint(1, 5)
 
         super().__init__(
-            filename=f"images/sprites/explosion{type}.png",
-            scale=scale,
+            texture=textures.get(**ENEMY_TEXTURE),
+            scale=scale
         )
 
-        self.position = position
-        self.lifetime = lifetime
-        self.start_size = start_size
+    def reset(self, max_x, max_y, rng=random):
+        """
+        Put the enemy somewhere on the screen
+        """
+        self.center_x = rng.randint(0, max_x)
+        self.center_y = rng.randint(0, max_y)
 
-    def on_update(self, delta_time: float = 1 / 60):
-        self.scale = self.lifetime/delta_time * self.start_size
+        self.angle = rng.randint(0, 360)
 
-        self.lifetime -= delta_time
+    def remove_from_sprite_lists(self):
+        """
+        Remove the sprite from all sprite lists and from its swarm, and
+        return it to its pool
+        """
+        was_active = len(self.sprite_lists) > 0
 
-        if self.lifetime <= 0:
-            self.kill()
+        if self.swarm is not None:
+            self.swarm.remove(self)
 
-        self.position = position
-        self.lifetime = lifetime
-        self.start_size = start_size
+        super().remove_from_sprite_lists()
 
-    def on_update(self, delta_time: float = 1 / 60):
-        self.scale = self.lifetime/delta_time * self.start_size
+        if was_active and self.pool is not None:
+            self.pool.release(self)
 
-        self.lifetime -= delta_time
 
-        if self.lifetime <= 0:
-            self.kill()
-        
 class PlayerShot(arcade.Sprite):
     """
-    A shot fired by the Player
+    A shot fired by the Player. Shots are recycled by a ShotPool,
+    see my_pools.py
     """
 
-    def __init__(self, position, angle, speed, scale=1):
+    def __init__(self, position, angle, speed, max_x, max_y, max_range, scale=1):
         """
         Setup new PlayerShot object
         """
 
+        self.max_x = max_x
+        self.max_y = max_y
+
+        # The shot is removed after flying this far
+        self.max_range = max_range
+        self.distance = 0
+
+        # The pool the shot returns to when it is removed
+        self.pool = None
+
         # Set the graphics to use for the sprite
         # We need to flip it so it matches the mathematical angle/direction
         super().__init__(
-            filename="images/sprites/bulletSand1.png",
-            scale=scale,
-            flipped_diagonally=True,
-            flipped_horizontally=True,
-            flipped_vertically=False
+            texture=textures.get(**PLAYERSHOT_TEXTURE),
+            scale=scale
         )
 
+        self.reset(position, angle, speed)
+
+    def reset(self, position, angle, speed):
+        """
+        Start the shot again from position
+        """
+
         # Shoot points in this direction
         self.angle = angle
 
@@ -265,63 +294,36 @@ class PlayerShot(arcade.Sprite):
         self.position = position
 
         # Shot moves forward
+        self.stop()
         self.forward(speed)
+        self.speed = speed
+        self.distance = 0
 
-
-    def update(self):
+    def on_update(self, delta_time):
         """
-        Move the sprite
+        Move the sprite. The speed is in pixels per second.
         """
 
         # Update the position
-        self.center_x += self.change_x
-        self.center_y += self.change_y
-
-        # Remove shot when over top of screen
-        # if self.bottom > SCREEN_HEIGHT:
-        #    self.kill()
-
-
-class LifeBar(arcade.Sprite):
-    """
-
-    """
-
-    def __init__(self, target_sprite, max_energy, size_multiplier=1, height=20, y_offset=30):
-        self.target_sprite = target_sprite
-        self.max_energy = max_energy
-        self.size_multiplier = size_multiplier
-        self.bar_height = height
-        self.y_offset = y_offset
-
-        super().__init__(
-            scale=0,
-            flipped_diagonally=True,
-            flipped_horizontally=True,
-            flipped_vertically=False
-        )
-
-    def draw(self):
+        self.center_x += self.change_x * delta_time
+        self.center_y += self.change_y * delta_time
+        self.distance += abs(self.speed) * delta_time
 
-        x = self.target_sprite.center_x
-        y = self.target_sprite.center_y + self.y_offset
-        h = self.bar_height * self.size_multiplier
+        # Remove shot when it leaves the screen or has flown too far
+        if self.distance > self.max_range:
+            self.kill()
+        elif self.left > self.max_x or self.right < 0:
+            self.kill()
+        elif self.bottom > self.max_y or self.top < 0:
+            self.kill()
 
-        # draws a red rectangle behind the dynamic green rectangle
-        arcade.draw_rectangle_filled(
-            center_x=x,
-            center_y=y,
-            width=self.max_energy * self.size_multiplier,
-            height=h,
-            color=arcade.color.RED
-        )
+    def remove_from_sprite_lists(self):
+        """
+        Remove the sprite from all sprite lists and return it to its pool
+        """
+        was_active = len(self.sprite_lists) > 0
 
-        # draws a rectangle that scales its width with the amount of energy
-        arcade.draw_rectangle_filled(
-            center_x=x + (self.target_sprite.energy / 2 - (self.max_energy / 2)) * self.size_multiplier,
-            center_y=y,
-            width=self.target_sprite.energy * self.size_multiplier,
-            height=h,
-            color=arcade.color.GREEN
-        )
+        super().remove_from_sprite_lists()
 
+        if was_active and self.pool is not None:
+            self.pool.release(self)
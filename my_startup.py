@@ -0,0 +1,179 @@
+"""
+Gets the game on the screen quickly.
+
+The window opens at once and shows a loading screen. All images under
+images/ are decoded on a background thread while the main thread, a few
+every frame, turns the ones the sprites use into textures and uploads them
+to the graphics card. After that the rest of the startup runs one stage per
+frame, so the loading screen keeps being drawn. The time of every stage is
+kept for a report when the game starts.
+"""
+
+import collections
+import contextlib
+import time
+
+from my_sprites import SPRITE_TEXTURES
+from my_textures import ImageDecoder, image_files, textures
+
+
+# Milliseconds per frame spent making and uploading textures
+UPLOAD_BUDGET_MS = 4
+
+
+class Startup:
+    """
+    The stages of starting the game, run a bit every frame
+    """
+
+    def __init__(self, filenames=None, specs=SPRITE_TEXTURES, registry=textures, atlas=None,
+                 upload_budget_ms=UPLOAD_BUDGET_MS, start_time=None):
+        """
+        Setup new Startup object. specs are the textures to upload, as
+        arguments for TextureRegistry.get(). The textures are added to atlas
+        if one is given. start_time is the perf_counter() the timings are
+        from, now if not given.
+        """
+        if start_time is None:
+            start_time = time.perf_counter()
+        self.start_time = start_time
+
+        self.registry = registry
+        self.atlas = atlas
+        self.upload_budget = upload_budget_ms / 1000
+
+        if filenames is None:
+            filenames = image_files()
+        self.decoder = ImageDecoder(filenames)
+
+        # The textures waiting for their file to be decoded, by file name.
+        # Files that are not decoded are loaded the usual way.
+        decoded = set(self.decoder.filenames)
+        self.waiting = collections.defaultdict(list)
+        self.uploads = collections.deque()
+        for spec in specs:
+            if spec["filename"] in decoded:
+                self.waiting[spec["filename"]].append(spec)
+            else:
+                self.uploads.append(spec)
+
+        self.decoded = 0
+        self.uploaded = 0
+        self.total_uploads = len(specs)
+
+        # The stages after the textures as (name, function), run in order
+        self.stages = collections.deque()
+        self.total_stages = 0
+
+        # Seconds spent in every stage, and seconds from the start until
+        # every mark, in order
+        self.times = {}
+        self.marks = {}
+
+        self.done = False
+
+    def start(self):
+        """
+        Start decoding the images
+        """
+        self.decoder.start()
+
+    def add_stage(self, name, function):
+        """
+        Add a stage to run after the textures are uploaded
+        """
+        self.stages.append((name, function))
+        self.total_stages += 1
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """
+        Add the time of a block to a stage
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name, seconds):
+        """
+        Add seconds to a stage
+        """
+        self.times[name] = self.times.get(name, 0) + seconds
+
+    def mark(self, name):
+        """
+        Note the time since the start, only the first time
+        """
+        if name not in self.marks:
+            self.marks[name] = time.perf_counter() - self.start_time
+
+    @property
+    def progress(self):
+        """
+        How much of the startup is done, from 0 to 1
+        """
+        total = len(self.decoder.filenames) + self.total_uploads + self.total_stages
+        done = self.decoded + self.uploaded + self.total_stages - len(self.stages)
+        return done / total if total else 1.0
+
+    def update(self):
+        """
+        Do the startup work of one frame. Returns True when all is done.
+        """
+        if self.done:
+            return True
+
+        with self.stage("upload"):
+            deadline = time.perf_counter() + self.upload_budget
+
+            # Take the images the decoder has finished so far
+            while not self.decoder.queue.empty():
+                filename, image = self.decoder.queue.get()
+                self.decoded += 1
+                if image is not None:
+                    self.registry.add_image(filename, image)
+                self.uploads.extend(self.waiting.pop(filename, []))
+
+            # Make and upload textures until the time is up, at least one
+            # every frame
+            while self.uploads:
+                texture, = self.registry.preload([self.uploads.popleft()])
+                if self.atlas is not None:
+                    self.atlas.add(texture)
+                self.uploaded += 1
+                if time.perf_counter() > deadline:
+                    break
+
+        if self.decoded < len(self.decoder.filenames) or self.uploads:
+            return False
+
+        if self.stages:
+            name, function = self.stages.popleft()
+            with self.stage(name):
+                function()
+            return False
+
+        self.record("decode", self.decoder.seconds)
+        self.mark("ready")
+        self.done = True
+        return True
+
+    def run(self):
+        """
+        Do all of the startup now, for tools without a loading screen
+        """
+        while not self.update():
+            self.decoder.join(0.001)
+
+    def report(self):
+        """
+        The timings as lines of text
+        """
+        lines = ["Startup, {} images, {} textures".format(self.decoded, self.uploaded)]
+        for name, seconds in self.times.items():
+            lines.append("  {:<16} {:8.1f} ms".format(name, seconds * 1000))
+        for name, seconds in self.marks.items():
+            lines.append("  {:<16} {:8.1f} ms after start".format(name, seconds * 1000))
+        return "\n".join(lines)
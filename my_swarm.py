@@ -0,0 +1,155 @@
+"""
+Moves all the enemies at once.
+
+The positions and speeds of the enemies are kept in a ComponentStore, so
+steering towards the player, moving and removing enemies that leave the
+screen is done for the whole swarm in one pass instead of once per sprite.
+"""
+
+import numpy as np
+
+from my_entities import ComponentStore
+
+
+# The components of an enemy
+ENEMY_COMPONENTS = {
+    "x": np.float64,
+    "y": np.float64,
+    "speed": np.float32,
+    # The positions before the last update, used to draw between updates
+    "previous_x": np.float64,
+    "previous_y": np.float64,
+    # Half the size of the sprites, used to find the edges
+    "half_width": np.float32,
+    "half_height": np.float32,
+}
+
+
+class EnemySwarm:
+    """
+    The movement of all the enemies in a sprite list
+    """
+
+    def __init__(self, max_x, max_y, capacity=64):
+        """
+        Setup new EnemySwarm object
+        """
+        self.max_x = max_x
+        self.max_y = max_y
+
+        self.store = ComponentStore(ENEMY_COMPONENTS, capacity=capacity)
+
+    def __len__(self):
+        return len(self.store)
+
+    @property
+    def sprites(self):
+        """
+        The enemies in the same order as the arrays
+        """
+        return self.store.views
+
+    def add(self, enemy, speed):
+        """
+        Let the swarm move an enemy
+        """
+        x, y = enemy.position
+        self.store.add(
+            enemy,
+            x=x,
+            y=y,
+            previous_x=x,
+            previous_y=y,
+            speed=speed,
+            half_width=enemy.width / 2,
+            half_height=enemy.height / 2
+        )
+        enemy.swarm = self
+
+    def remove(self, enemy):
+        """
+        Stop moving an enemy
+        """
+        self.store.remove(enemy)
+        enemy.swarm = None
+
+    def update(self, delta_time, target_x, target_y, flow_field=None):
+        """
+        Move all enemies towards the target and kill the ones that
+        leave the screen. With a flow field, enemies without a straight
+        line to the target follow the headings of the field and do not
+        walk into blocked cells.
+        """
+        store = self.store
+        if len(store) == 0:
+            return
+
+        x = store["x"]
+        y = store["y"]
+        speed = store["speed"]
+        store["previous_x"][:] = x
+        store["previous_y"][:] = y
+
+        # makes the enemies follow the target
+        dx = target_x - x
+        dy = target_y - y
+        distance = np.hypot(dx, dy)
+
+        # An enemy on top of the target moves up, like the old sprite code did
+        with np.errstate(invalid="ignore", divide="ignore"):
+            step = speed * delta_time / distance
+        on_target = distance == 0
+        move_x = np.where(on_target, 0, dx * step)
+        move_y = np.where(on_target, speed * delta_time, dy * step)
+
+        # Enemies that can not see the target walk around what is in the way
+        if flow_field is not None:
+            heading_x, heading_y, direct = flow_field.lookup(x, y)
+            follow = ~direct & ((heading_x != 0) | (heading_y != 0))
+            move_x = np.where(follow, heading_x * speed * delta_time, move_x)
+            move_y = np.where(follow, heading_y * speed * delta_time, move_y)
+            dx = np.where(follow, heading_x, dx)
+            dy = np.where(follow, heading_y, dy)
+
+            # Slide along obstacles instead of walking into them. An enemy
+            # that is already in a blocked cell may walk out of it.
+            if flow_field.blocked.any():
+                free = ~flow_field.blocked_at(x, y)
+                move_x[free & flow_field.blocked_at(x + move_x, y)] = 0
+                move_y[free & flow_field.blocked_at(x + move_x, y + move_y)] = 0
+
+        angle = np.degrees(np.arctan2(dx, dy))
+        x += move_x
+        y += move_y
+
+        # Write the new positions back to the sprites
+        for sprite, sx, sy, a in zip(store.views, x.tolist(), y.tolist(), angle.tolist()):
+            sprite.position = (sx, sy)
+            sprite.angle = a
+
+        # Kill the enemies that left the screen
+        half_width = store["half_width"]
+        half_height = store["half_height"]
+        outside = (
+            (x + half_width > self.max_x)
+            | (x - half_width < 0)
+            | (y - half_height > self.max_y)
+            | (y + half_height < 0)
+        )
+        # Backwards, so the enemies moved by remove() are already checked
+        for i in np.flatnonzero(outside)[::-1]:
+            store.views[i].kill()
+
+    def interpolate(self, alpha):
+        """
+        Place the enemy sprites alpha of the way from where they were before
+        the last update to where they are now
+        """
+        store = self.store
+        previous_x = store["previous_x"]
+        previous_y = store["previous_y"]
+        x = previous_x + (store["x"] - previous_x) * alpha
+        y = previous_y + (store["y"] - previous_y) * alpha
+
+        for sprite, sx, sy in zip(store.views, x.tolist(), y.tolist()):
+            sprite.position = (sx, sy)
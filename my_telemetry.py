@@ -0,0 +1,273 @@
+"""
+Watches the number of sprites and the memory used by the game.
+
+Every interval ticks the Telemetry takes a sample of the populations of the
+world (see World.populations()), the number of memory blocks held by Python
+and the resident memory of the process. The samples can be streamed to a
+JSONL file from a background thread. A warning is given when something keeps
+growing faster than a threshold, which is what a leak looks like.
+
+It can also soak the game: play it headless with scripted input for a long
+time and report what grew.
+
+Usage:
+    python my_telemetry.py --minutes 30 --output soak.jsonl
+"""
+
+import argparse
+import collections
+import json
+import os
+import queue
+import sys
+import threading
+import time
+
+
+# Defaults for the telemetry
+TELEMETRY_TICK_RATE = 60
+TELEMETRY_INTERVAL_TICKS = 60
+# Samples the growth rate is measured over
+TELEMETRY_WINDOW = 120
+# Most growth per minute of game time before a warning, by kind. Memory is
+# in megabytes.
+TELEMETRY_GROWTH_LIMITS = {
+    "default": 30,
+    "rss_mb": 5,
+    "allocated_blocks": 20000,
+}
+
+
+def rss_bytes():
+    """
+    The resident memory of the process, or 0 if it can not be found
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+
+    try:
+        import resource
+        # The peak, not the current size. Kilobytes on Linux, bytes on macOS.
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss if sys.platform == "darwin" else rss * 1024
+    except (ImportError, OSError):
+        return 0
+
+
+def slope(points):
+    """
+    The slope of the least squares line through (x, y) points
+    """
+    n = len(points)
+    mean_x = sum(x for x, y in points) / n
+    mean_y = sum(y for x, y in points) / n
+    var = sum((x - mean_x) ** 2 for x, y in points)
+    if var == 0:
+        return 0
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / var
+
+
+class SampleWriter(threading.Thread):
+    """
+    Writes samples to a JSONL file from a background thread
+    """
+
+    def __init__(self, filename):
+        """
+        Setup new SampleWriter object
+        """
+        super().__init__(daemon=True)
+        self.filename = filename
+        self.queue = queue.Queue()
+
+    def put(self, sample):
+        """
+        Queue a sample for writing
+        """
+        self.queue.put(sample)
+
+    def close(self):
+        """
+        Write what is queued and stop the thread
+        """
+        self.queue.put(None)
+        self.join()
+
+    def run(self):
+        with open(self.filename, "w") as f:
+            while True:
+                sample = self.queue.get()
+                if sample is None:
+                    break
+                f.write(json.dumps(sample) + "\n")
+                f.flush()
+
+
+class Telemetry:
+    """
+    Samples the populations of a world and the memory of the process
+    """
+
+    def __init__(self, world, interval_ticks=TELEMETRY_INTERVAL_TICKS, output=None,
+                 window=TELEMETRY_WINDOW, growth_limits=None, on_warning=None,
+                 tick_rate=TELEMETRY_TICK_RATE):
+        """
+        Setup new Telemetry object. on_warning is called with the text of
+        every warning, the default writes it to stderr.
+        """
+        self.world = world
+        self.tick_rate = tick_rate
+        self.interval_ticks = interval_ticks
+        self.window = window
+
+        self.growth_limits = dict(TELEMETRY_GROWTH_LIMITS)
+        if growth_limits is not None:
+            self.growth_limits.update(growth_limits)
+
+        if on_warning is None:
+            on_warning = lambda text: print(text, file=sys.stderr)
+        self.on_warning = on_warning
+
+        # The last samples, for the growth rates
+        self.samples = collections.deque(maxlen=window)
+
+        # The kinds currently growing too fast, so every growth spurt is
+        # only warned about once
+        self.growing = set()
+        self.warnings = []
+
+        self.last_blocks = sys.getallocatedblocks()
+        self.last_tick = world.ticks
+
+        # Streams all samples to a file
+        self.writer = None
+        if output is not None:
+            self.writer = SampleWriter(output)
+            self.writer.start()
+
+    def tick(self):
+        """
+        Call after every step of the world. Takes a sample every
+        interval_ticks ticks.
+        """
+        if self.world.ticks - self.last_tick >= self.interval_ticks:
+            self.sample()
+
+    def sample(self):
+        """
+        Take a sample now and check the growth rates
+        """
+        world = self.world
+        ticks = world.ticks - self.last_tick
+        blocks = sys.getallocatedblocks()
+
+        sample = {
+            "tick": world.ticks,
+            "time": time.time(),
+            "rss_mb": rss_bytes() / 2 ** 20,
+            "allocated_blocks": blocks,
+            # The net number of memory blocks Python took per tick
+            "blocks_per_tick": (blocks - self.last_blocks) / ticks if ticks else 0,
+        }
+        sample.update(world.populations())
+
+        self.last_blocks = blocks
+        self.last_tick = world.ticks
+        self.samples.append(sample)
+
+        if self.writer is not None:
+            self.writer.put(sample)
+
+        self.check_growth()
+        return sample
+
+    def growth(self, name):
+        """
+        The growth of a value per minute of game time, over the recent samples
+        """
+        if len(self.samples) < 2:
+            return 0
+        per_tick = slope([(s["tick"], s[name]) for s in self.samples])
+        return per_tick * self.tick_rate * 60
+
+    def check_growth(self):
+        """
+        Warn about the values growing faster than their limit and still
+        growing. A value is only judged once the window is full.
+        """
+        if len(self.samples) < self.window:
+            return
+
+        # Something that has stopped growing, like a ring that got full,
+        # is not a leak
+        recent = self.samples[-max(2, self.window // 4)]
+
+        for name, value in self.samples[-1].items():
+            if name in ("tick", "time", "blocks_per_tick"):
+                continue
+
+            limit = self.growth_limits.get(name, self.growth_limits["default"])
+            rate = self.growth(name)
+            if rate > limit and value > recent[name]:
+                if name not in self.growing:
+                    self.growing.add(name)
+                    text = "{} is growing {:.1f} per minute (limit {}) at tick {}, now {:.0f}".format(
+                        name, rate, limit, self.samples[-1]["tick"], value
+                    )
+                    self.warnings.append(text)
+                    self.on_warning(text)
+            else:
+                self.growing.discard(name)
+
+    def close(self):
+        """
+        Finish writing the file, if any
+        """
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+def main():
+    """
+    Soak the game headless and report what grew
+    """
+    from benchmark import make_inputs
+    from my_world import World
+
+    parser = argparse.ArgumentParser(description="Play the game headless for a long time and watch for growth")
+    parser.add_argument("--minutes", type=float, default=10, help="minutes of game time")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--interval", type=int, default=TELEMETRY_INTERVAL_TICKS, help="ticks between samples")
+    parser.add_argument("--output", help="write the samples to a .jsonl file")
+    args = parser.parse_args()
+
+    world = World(seed=args.seed)
+    world.setup()
+    telemetry = Telemetry(world, interval_ticks=args.interval, output=args.output)
+
+    ticks = int(args.minutes * 60 * TELEMETRY_TICK_RATE)
+    start = time.perf_counter()
+    for tick in range(ticks):
+        world.step(1 / TELEMETRY_TICK_RATE, make_inputs(tick))
+        telemetry.tick()
+    elapsed = time.perf_counter() - start
+
+    # A sample of the end, also when the run was shorter than an interval
+    if not telemetry.samples or telemetry.samples[-1]["tick"] != world.ticks:
+        telemetry.sample()
+    telemetry.close()
+
+    last = telemetry.samples[-1]
+    print("ticks: {}  seconds: {:.1f}  rss: {:.1f} MB".format(ticks, elapsed, last["rss_mb"]))
+    for name in world.populations():
+        print("{:<18} {:>6}  {:+.2f} per minute".format(name, last[name], telemetry.growth(name)))
+    print("{} warning(s)".format(len(telemetry.warnings)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+A shared cache of the textures used by the sprites.
+
+All textures are loaded and flipped once, before the game starts, and the
+same Texture objects are handed to every sprite using them. Creating a
+sprite then never reads or decodes an image file.
+
+The image files can be decoded on a background thread by an ImageDecoder
+and handed to the registry with add_image(). Textures made from those
+images do not touch the disk at all.
+"""
+
+import glob
+import os
+import queue
+import threading
+import time
+
+import arcade
+import PIL.Image
+
+
+# Where the images of the game are
+IMAGE_DIRECTORY = "images"
+
+
+def image_files(directory=IMAGE_DIRECTORY):
+    """
+    All PNG files under a directory
+    """
+    return sorted(glob.glob(os.path.join(directory, "**", "*.png"), recursive=True))
+
+
+def decode_image(filename):
+    """
+    Read and decode an image file the way arcade does
+    """
+    return PIL.Image.open(filename).convert("RGBA")
+
+
+class ImageDecoder(threading.Thread):
+    """
+    Decodes image files on a background thread. The decoded images are put
+    on the queue as (filename, image), with None for files that could not
+    be read.
+    """
+
+    def __init__(self, filenames):
+        """
+        Setup new ImageDecoder object
+        """
+        super().__init__(daemon=True)
+        self.filenames = list(filenames)
+        self.queue = queue.Queue()
+
+        # Seconds from the start to the end of decoding
+        self.seconds = 0
+
+    def run(self):
+        start = time.perf_counter()
+        for filename in self.filenames:
+            try:
+                image = decode_image(filename)
+            except OSError:
+                # Loaded the usual way when it is used, which reports the error
+                image = None
+            self.queue.put((filename, image))
+        self.seconds = time.perf_counter() - start
+
+
+class TextureRegistry:
+    """
+    Textures by file name and flips, loaded once
+    """
+
+    def __init__(self):
+        """
+        Setup new TextureRegistry object
+        """
+        self.textures = {}
+
+        # Decoded images by file name, see add_image()
+        self.images = {}
+
+        # Lookups that found a loaded texture and lookups that had to load it
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, filename, flipped_horizontally=False, flipped_vertically=False, flipped_diagonally=False):
+        """
+        The texture for an image file with the given flips
+        """
+        key = (filename, flipped_horizontally, flipped_vertically, flipped_diagonally)
+
+        texture = self.textures.get(key)
+        if texture is not None:
+            self.hits += 1
+            return texture
+
+        self.misses += 1
+        image = self.images.get(filename)
+        if image is None:
+            texture = arcade.load_texture(
+                filename,
+                flipped_horizontally=flipped_horizontally,
+                flipped_vertically=flipped_vertically,
+                flipped_diagonally=flipped_diagonally
+            )
+        else:
+            texture = make_texture(image, *key)
+        self.textures[key] = texture
+        return texture
+
+    def add_image(self, filename, image):
+        """
+        Add a decoded image file. Textures of it are made from the image
+        instead of loading the file.
+        """
+        self.images[filename] = image
+
+    def preload(self, specs):
+        """
+        Load a list of textures and return them. Each spec is a dict of
+        arguments for get(). Loading does not count as a miss.
+        """
+        misses = self.misses
+        loaded = [self.get(**spec) for spec in specs]
+        self.misses = misses
+        return loaded
+
+    def stats(self):
+        """
+        The size and use of the cache
+        """
+        return {
+            "textures": len(self.textures),
+            "images": len(self.images),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+def make_texture(image, filename, flipped_horizontally, flipped_vertically, flipped_diagonally):
+    """
+    A texture of a decoded image, flipped the same way arcade.load_texture()
+    flips it
+    """
+    if flipped_diagonally:
+        image = image.transpose(PIL.Image.TRANSPOSE)
+    if flipped_horizontally:
+        image = image.transpose(PIL.Image.FLIP_LEFT_RIGHT)
+    if flipped_vertically:
+        image = image.transpose(PIL.Image.FLIP_TOP_BOTTOM)
+
+    name = "{}-{}-{}-{}".format(filename, flipped_horizontally, flipped_vertically, flipped_diagonally)
+    return arcade.Texture(name, image)
+
+
+# The registry shared by all sprites
+textures = TextureRegistry()
@@ -0,0 +1,633 @@
+"""
+The rules of the game, without a window.
+
+The World owns the player, the canon, the enemies, the shots, the pickups and
+the waves. It is moved forward with step() and can run without a display, so
+it can be used for tests, benchmarks and bots. MyGame in my_game.py draws it.
+
+All speeds are per second and scaled with the delta_time given to step(), so
+the game plays the same at any tick rate.
+"""
+import random
+
+import arcade
+
+from my_sprites import Player, Canon, Coin, Fuel, TireTracks, preload_textures, EXPLOSION_TEXTURES
+from my_collisions import SpatialHash
+from my_swarm import EnemySwarm
+from my_pools import ShotPool, EnemyPool, SpawnScheduler
+from my_decals import DecalRing
+from my_profiler import FrameProfiler
+from my_pickups import PickupManager, PickupType
+from my_particles import ParticleEmitter
+from my_flowfield import FlowField
+from my_chunks import ChunkedSpriteList, SuspendedEnemies
+from my_obstacles import ObstacleLayer
+from my_textures import textures
+
+
+SPRITE_SCALING = 1
+
+# Set the size of the screen
+SCREEN_WIDTH = 800
+SCREEN_HEIGHT = 600
+
+# Variables controlling the player
+PLAYER_LIVES = 3
+# pixels per second
+PLAYER_SPEED = 300
+# degrees per second
+PLAYER_TURN_SPEED = 300
+PLAYER_START_X = SCREEN_WIDTH / 2
+PLAYER_START_Y = 50
+PLAYER_START_ENERGY = 200
+PLAYER_MAX_ENERGY = 200
+
+#variables controlling the player_shot
+# pixels per second
+PLAYER_SHOT_SPEED = 300
+# shots are removed after flying this many pixels
+PLAYER_SHOT_MAX_RANGE = 1000
+# number of shots created before the game starts
+PLAYER_SHOT_POOL_SIZE = 32
+
+
+# variables controlling the canon
+# degrees per second
+CANON_ROTATE_SPEED = 300
+
+# variables controlling the enemy
+BASE_NUMBER_OF_ENEMYS = 10
+
+# variables controlling the enemies
+ENEMY_MOVE_SPEED = 16
+# energy lost per second while an enemy touches the tank
+ENEMY_CONTACT_DAMAGE = 60
+# most enemies spawned in one tick, the rest of a wave follows in later ticks
+ENEMY_SPAWN_PER_TICK = 4
+# most enemies created per tick to get ready for the next wave
+ENEMY_PREWARM_PER_TICK = 2
+
+# variables controlling the tire-
+TIRETRACK_LIFETIME_SECONDS = 10
+# tracks left per second while driving, on average
+TIRETRACK_SPAWN_RATE = 12
+# the most tire tracks on the ground, the oldest are reused
+TIRETRACK_CAPACITY = 256
+
+# variables controlling the explosions
+# particles started by a kill
+EXPLOSION_PARTICLES = 3
+# the most particles alive at once, the oldest are reused
+EXPLOSION_CAPACITY = 128
+EXPLOSION_LIFETIME_SECONDS = 1
+# pixels per second
+EXPLOSION_PARTICLE_SPEED = 40
+EXPLOSION_START_SCALE = 0.6
+EXPLOSION_END_SCALE = 0.1
+
+# Size of the cells in the collision grid
+COLLISION_CELL_SIZE = 64
+
+# Size of the cells the enemies find their way in
+FLOW_CELL_SIZE = 32
+# cells around the player the way is found in
+FLOW_RADIUS = 24
+
+# The obstacles of the world, None for an empty world
+LEVEL_FILE = "levels/arena.txt"
+# pixels per character in a level file
+LEVEL_CELL_SIZE = 32
+# random positions tried for a new pickup before looking for a free cell
+PLACE_ATTEMPTS = 100
+
+# variables controlling worlds larger than the screen
+# size of the parts the world is cut into
+WORLD_CHUNK_SIZE = 1024
+# enemies this far outside the view are suspended, at twice the distance
+SUSPEND_MARGIN = 256
+# suspended enemies are moved this often
+SUSPEND_UPDATE_TICKS = 10
+
+# variables controling the pickups
+# seconds between new pickups
+PICKUP_SPAWN_TIMER = 5
+
+# variables controling the coin
+START_COINS = 0
+COIN_VALUE = 10
+COIN_SPAWN_WEIGHT = 1
+COIN_CAPACITY = 10
+COIN_LIFETIME_SECONDS = 60
+
+# variables controling the fuel
+START_FUEL = 200
+FUEL_SPAWN_WEIGHT = 1
+FUEL_CAPACITY = 10
+FUEL_LIFETIME_SECONDS = 60
+FUEL_INCREMENT = 25
+FUEL_SPEED_FACTOR = 0.01
+
+
+class PlayerInput:
+    """
+    The state of the player controls during one step
+    """
+
+    def __init__(self, left=False, right=False, forward=False, backwards=False,
+                 canon_left=False, canon_right=False, fire=False):
+        """
+        Setup new PlayerInput object
+        """
+        self.left = left
+        self.right = right
+        self.forward = forward
+        self.backwards = backwards
+        self.canon_left = canon_left
+        self.canon_right = canon_right
+
+        # Fire a shot during this step
+        self.fire = fire
+
+
+class World:
+    """
+    All the game objects and the rules moving them
+    """
+
+    def __init__(self, width=SCREEN_WIDTH, height=SCREEN_HEIGHT, profiler=None, seed=None,
+                 view_width=SCREEN_WIDTH, view_height=SCREEN_HEIGHT, level=LEVEL_FILE):
+        """
+        Setup new World object. The world can be larger than the view, the
+        part of it that is shown on the screen.
+        """
+        self.width = width
+        self.height = height
+
+        # The level file the obstacles are loaded from
+        self.level = level
+        self.view_width = min(view_width, width)
+        self.view_height = min(view_height, height)
+
+        # The part of the world around the player, left, bottom, right, top
+        self.view = (0, 0, self.view_width, self.view_height)
+
+        # How much of the effects is shown, see apply_quality()
+        self.track_spawn_factor = 1.0
+        self.track_lifetime_factor = 1.0
+        self.explosion_particles = EXPLOSION_PARTICLES
+
+        # All randomness in the game comes from here, so a game can be
+        # played again from the seed and the inputs
+        self.seed = seed
+        self.rng = random.Random(seed)
+
+        # Times the phases of step(). Off unless one is given.
+        if profiler is None:
+            profiler = FrameProfiler(enabled=False)
+        self.profiler = profiler
+
+        # Load every texture now, so spawning sprites never touches the disk
+        preload_textures()
+
+        # Set up the player info
+        self.player_sprite = None
+        self.canon_sprite = None
+        self.player_score = None
+        self.player_lives = None
+
+        self.wave_number = 0
+
+        # Number of steps since setup()
+        self.ticks = 0
+
+        # Position and angle of the player and canon before and after
+        # the last step, used to draw between steps
+        self.previous_pose = None
+        self.current_pose = None
+
+    def setup(self):
+        """ Set up the game and initialize the variables. """
+
+        # Start the same game again for the same seed
+        self.rng.seed(self.seed)
+
+        # No points when the game starts
+        self.player_score = 0
+        self.ticks = 0
+
+        # No of lives
+        self.player_lives = PLAYER_LIVES
+
+        # Sprite lists
+        self.player_shot_list = arcade.SpriteList()
+        self.enemy_sprite_list = arcade.SpriteList()
+        self.coin_sprite_list = ChunkedSpriteList(WORLD_CHUNK_SIZE)
+        self.fuel_sprite_list = ChunkedSpriteList(WORLD_CHUNK_SIZE)
+        self.tire_track_list = arcade.SpriteList()
+
+        # Recycles the shots fired by the player
+        self.shot_pool = ShotPool(
+            sprite_list=self.player_shot_list,
+            max_x=self.width,
+            max_y=self.height,
+            max_range=PLAYER_SHOT_MAX_RANGE,
+            scale=SPRITE_SCALING,
+            size=PLAYER_SHOT_POOL_SIZE
+        )
+
+        # The tire tracks left by the player
+        self.tire_tracks = DecalRing(
+            sprite_list=self.tire_track_list,
+            make_sprite=lambda: TireTracks(scale=SPRITE_SCALING),
+            capacity=TIRETRACK_CAPACITY,
+            lifetime_seconds=TIRETRACK_LIFETIME_SECONDS * self.track_lifetime_factor
+        )
+
+        # The explosions of dead enemies. They have their own random numbers,
+        # so the effects never change how the game plays.
+        self.explosions = ParticleEmitter(
+            textures=[textures.get(**spec) for spec in EXPLOSION_TEXTURES],
+            capacity=EXPLOSION_CAPACITY,
+            lifetime=EXPLOSION_LIFETIME_SECONDS,
+            speed=EXPLOSION_PARTICLE_SPEED,
+            start_scale=EXPLOSION_START_SCALE * SPRITE_SCALING,
+            end_scale=EXPLOSION_END_SCALE * SPRITE_SCALING,
+            rng=random.Random(self.seed)
+        )
+
+        # Moves all the enemies at once
+        self.enemy_swarm = EnemySwarm(max_x=self.width, max_y=self.height)
+
+        # The way to the player, shared by all enemies
+        self.flow_field = FlowField(
+            self.width,
+            self.height,
+            cell_size=FLOW_CELL_SIZE,
+            radius=FLOW_RADIUS
+        )
+
+        # Dead enemies are kept and used again
+        self.enemy_pool = EnemyPool(scale=SPRITE_SCALING)
+        self.enemy_pool.create(BASE_NUMBER_OF_ENEMYS)
+
+        # Enemies far from the view, kept as numbers
+        self.suspended_enemies = SuspendedEnemies(
+            swarm=self.enemy_swarm,
+            pool=self.enemy_pool,
+            sprite_list=self.enemy_sprite_list,
+            margin=SUSPEND_MARGIN
+        )
+        self.suspend_time = 0
+
+        # Spreads the spawning of a wave over several ticks
+        self.spawner = SpawnScheduler(
+            pool=self.enemy_pool,
+            sprite_list=self.enemy_sprite_list,
+            swarm=self.enemy_swarm,
+            max_x=self.width,
+            max_y=self.height,
+            speed=ENEMY_MOVE_SPEED,
+            rng=self.rng,
+            per_tick=ENEMY_SPAWN_PER_TICK,
+            prewarm_per_tick=ENEMY_PREWARM_PER_TICK
+        )
+
+        # Grid used to find sprites close enough to collide
+        self.collision_hash = SpatialHash(cell_size=COLLISION_CELL_SIZE)
+        self.collision_hash.register("enemies", self.enemy_sprite_list)
+        self.collision_hash.register("player_shots", self.player_shot_list)
+
+        # Barricades and other things in the way
+        self.obstacles = ObstacleLayer(
+            collision_hash=self.collision_hash,
+            flow_field=self.flow_field,
+            scale=SPRITE_SCALING
+        )
+        if self.level is not None:
+            self.obstacles.load(self.level, LEVEL_CELL_SIZE, self.width, self.height)
+
+        # Coins and fuel on the ground
+        self.pickups = PickupManager(
+            collision_hash=self.collision_hash,
+            rng=self.rng,
+            spawn_time=PICKUP_SPAWN_TIMER
+        )
+        self.pickups.add_type(PickupType(
+            name="coins",
+            sprite_list=self.coin_sprite_list,
+            make_sprite=lambda: self.place_clear(Coin(self.width, self.height, rng=self.rng)),
+            collect=self.collect_coin,
+            capacity=COIN_CAPACITY,
+            lifetime=COIN_LIFETIME_SECONDS,
+            weight=COIN_SPAWN_WEIGHT
+        ))
+        self.pickups.add_type(PickupType(
+            name="fuel",
+            sprite_list=self.fuel_sprite_list,
+            make_sprite=lambda: self.place_clear(Fuel(self.width, self.height, rng=self.rng)),
+            collect=self.collect_fuel,
+            capacity=FUEL_CAPACITY,
+            lifetime=FUEL_LIFETIME_SECONDS,
+            weight=FUEL_SPAWN_WEIGHT
+        ))
+
+        # Create a Player object
+        self.player_sprite = Player(
+            energy=PLAYER_START_ENERGY,
+            center_x=PLAYER_START_X,
+            center_y=PLAYER_START_Y,
+            max_x=self.width,
+            max_y=self.height,
+            max_energy=PLAYER_MAX_ENERGY,
+
+            scale=SPRITE_SCALING,
+            fuel=START_FUEL
+        )
+
+        self.canon_sprite = Canon(
+            target_sprite=self.player_sprite,
+            rotate_speed=CANON_ROTATE_SPEED,
+            scale=SPRITE_SCALING
+            )
+
+        self.update_view()
+
+        # start wave_number
+        self.wave_number = self.start_new_wave(0)
+
+    def place_clear(self, sprite):
+        """
+        Move a new sprite somewhere else while it touches an obstacle
+        """
+        for attempt in range(PLACE_ATTEMPTS):
+            if not self.obstacles.blocks(sprite):
+                return sprite
+            sprite.position = (self.rng.randint(1, self.width), self.rng.randint(1, self.height))
+
+        # The world is crowded, try the free cells from a random one on
+        cells = [(x, y) for x, y in self.flow_field.free_cells() if x < self.width and y < self.height]
+        start = self.rng.randrange(len(cells)) if cells else 0
+        for position in cells[start:] + cells[:start]:
+            sprite.position = position
+            if not self.obstacles.blocks(sprite):
+                return sprite
+
+        raise RuntimeError("No room for a {} outside the obstacles".format(type(sprite).__name__))
+
+    def update_view(self):
+        """
+        Center the view on the player, without showing what is outside the
+        world
+        """
+        left = self.player_sprite.center_x - self.view_width / 2
+        left = min(max(left, 0), self.width - self.view_width)
+        bottom = self.player_sprite.center_y - self.view_height / 2
+        bottom = min(max(bottom, 0), self.height - self.view_height)
+        self.view = (left, bottom, left + self.view_width, bottom + self.view_height)
+        self.coin_sprite_list.view = self.view
+        self.fuel_sprite_list.view = self.view
+
+    def start_new_wave(self, wave_no):
+        """
+        creates new enemies on the screan. They are spawned a few at a time
+        over the next ticks.
+        """
+        self.spawner.queue(
+            BASE_NUMBER_OF_ENEMYS + wave_no,
+            next_count=BASE_NUMBER_OF_ENEMYS + wave_no + 1
+        )
+
+        return wave_no + 1
+
+    def fire(self):
+        """
+        Fire a shot from the canon
+        """
+        self.shot_pool.fire(
+            position=self.player_sprite.position,
+            angle=self.canon_sprite.angle,
+            speed=PLAYER_SHOT_SPEED
+        )
+
+    def pose(self):
+        """
+        Position and angle of the player and the canon
+        """
+        return (
+            self.player_sprite.position,
+            self.player_sprite.angle,
+            self.canon_sprite.position,
+            self.canon_sprite.angle
+        )
+
+    def interpolate(self, alpha):
+        """
+        Place the player, canon and enemies alpha of the way from where they
+        were before the last step to where they are now. Call it again with
+        an alpha of 1 before the next step.
+        """
+        if self.previous_pose is None:
+            return
+
+        def lerp(a, b):
+            return a + (b - a) * alpha
+
+        previous = self.previous_pose
+        current = self.current_pose
+
+        self.player_sprite.position = (
+            lerp(previous[0][0], current[0][0]),
+            lerp(previous[0][1], current[0][1])
+        )
+        self.player_sprite.angle = lerp(previous[1], current[1])
+        self.canon_sprite.position = (
+            lerp(previous[2][0], current[2][0]),
+            lerp(previous[2][1], current[2][1])
+        )
+        self.canon_sprite.angle = lerp(previous[3], current[3])
+
+        self.enemy_swarm.interpolate(alpha)
+
+    def step(self, delta_time, inputs):
+        """
+        Movement and game logic
+        """
+        profiler = self.profiler
+        self.previous_pose = self.pose()
+
+        with profiler.phase("pickups"):
+            self.pickups.update(delta_time)
+
+        with profiler.phase("player"):
+            self.move_player(delta_time, inputs)
+
+        with profiler.phase("sprites"):
+            self.update_sprites(delta_time, inputs)
+            self.update_view()
+
+        with profiler.phase("enemies"):
+            self.flow_field.update(self.player_sprite.center_x, self.player_sprite.center_y)
+            self.enemy_swarm.update(
+                delta_time,
+                self.player_sprite.center_x,
+                self.player_sprite.center_y,
+                flow_field=self.flow_field
+            )
+
+            # Move and wake the enemies far away now and then
+            self.suspend_time += delta_time
+            if self.ticks % SUSPEND_UPDATE_TICKS == 0:
+                self.suspended_enemies.update(
+                    self.suspend_time,
+                    self.view,
+                    self.player_sprite.center_x,
+                    self.player_sprite.center_y
+                )
+                self.suspend_time = 0
+
+        with profiler.phase("collisions"):
+            self.check_collisions(delta_time)
+
+        # checks if the level has ended
+        with profiler.phase("waves"):
+            if len(self.enemy_sprite_list) + len(self.suspended_enemies) <= 0 and self.spawner.pending == 0:
+                self.wave_number = self.start_new_wave(self.wave_number)
+            self.spawner.update()
+
+        self.current_pose = self.pose()
+        self.ticks += 1
+
+    def apply_quality(self, settings):
+        """
+        Change how many effects are shown, see my_quality.py. Nothing that
+        changes how the game plays.
+        """
+        self.track_spawn_factor = settings["track_spawn_factor"]
+        self.track_lifetime_factor = settings["track_lifetime_factor"]
+        self.explosion_particles = settings["explosion_particles"]
+        self.tire_tracks.lifetime_seconds = TIRETRACK_LIFETIME_SECONDS * self.track_lifetime_factor
+
+    def populations(self):
+        """
+        The number of objects of every kind in the world, by name
+        """
+        return {
+            "player_shots": len(self.player_shot_list),
+            "free_shots": len(self.shot_pool.free),
+            "created_shots": self.shot_pool.created,
+            "enemies": len(self.enemy_sprite_list),
+            "suspended_enemies": len(self.suspended_enemies),
+            "free_enemies": len(self.enemy_pool.free),
+            "created_enemies": self.enemy_pool.created,
+            "explosions": len(self.explosions),
+            "coins": len(self.coin_sprite_list),
+            "fuel": len(self.fuel_sprite_list),
+            "tire_tracks": len(self.tire_track_list),
+            "obstacles": len(self.obstacles),
+        }
+
+    def collect_coin(self, player):
+        """
+        The player picked up a coin
+        """
+        player.coins += COIN_VALUE
+
+    def collect_fuel(self, player):
+        """
+        The player picked up fuel
+        """
+        player.fuel += FUEL_INCREMENT
+
+    def move_player(self, delta_time, inputs):
+        """
+        Burn fuel, turn and drive the player and fire
+        """
+        moving = inputs.forward or inputs.backwards
+
+        # fuel loss
+        if moving:
+            # looses fuel the more fuel you have
+            self.player_sprite.fuel -= delta_time * self.player_sprite.fuel / 100
+
+        # insure fuel is between 0 and 20
+        self.player_sprite.fuel = max(40, self.player_sprite.fuel)
+        self.player_sprite.fuel = min(100, self.player_sprite.fuel)
+
+        # Append new tire tracks randomly
+        if moving:
+            # The random number is drawn at every quality, so the game plays the same
+            if self.rng.random() < TIRETRACK_SPAWN_RATE * self.track_spawn_factor * delta_time:
+                self.tire_tracks.spawn(self.player_sprite)
+
+        # Calculate player speed based on the keys pressed
+        self.player_sprite.change_x = 0
+
+        # Move player
+        turn = PLAYER_TURN_SPEED * delta_time
+        speed = PLAYER_SPEED * (FUEL_SPEED_FACTOR * self.player_sprite.fuel) * delta_time
+        if inputs.left and not inputs.right:
+            self.player_sprite.angle += turn
+        if inputs.right and not inputs.left:
+            self.player_sprite.angle += -turn
+        if inputs.forward and not inputs.backwards:
+            self.player_sprite.forward(speed)
+        if inputs.backwards and not inputs.forward:
+            self.player_sprite.forward(-speed)
+
+        if inputs.fire:
+            self.fire()
+
+    def update_sprites(self, delta_time, inputs):
+        """
+        Update the player, canon, shots, tracks and explosions
+        """
+        self.player_sprite.update()
+        self.obstacles.push_out(self.player_sprite)
+        self.tire_tracks.on_update(delta_time)
+        # Shots remove themselves from the list, so loop over a copy or the
+        # shot after a removed one would not move
+        for shot in list(self.player_shot_list):
+            shot.on_update(delta_time)
+        self.explosions.on_update(delta_time)
+        self.canon_sprite.on_update(delta_time)
+
+        if inputs.canon_left:
+            self.canon_sprite.relative_angle += self.canon_sprite.canon_rotate_speed * delta_time
+        elif inputs.canon_right:
+            self.canon_sprite.relative_angle -= self.canon_sprite.canon_rotate_speed * delta_time
+
+    def check_collisions(self, delta_time):
+        """
+        Kill enemies hit by shots, collect pickups and hurt the player
+        """
+
+        # Put the sprites that moved in their new cells
+        self.collision_hash.rebuild()
+
+        # Shots stop at obstacles
+        hit = set()
+        for s, o in self.collision_hash.collisions("player_shots", "obstacles"):
+            if id(s) not in hit:
+                hit.add(id(s))
+                s.kill()
+
+        # checks for collisions between the player_shot and enemy sprite
+        for e, s in self.collision_hash.collisions("enemies", "player_shots"):
+            # A shot can only kill one enemy and an enemy only dies once
+            if id(e) in hit or id(s) in hit:
+                continue
+            hit.add(id(e))
+            hit.add(id(s))
+            e.kill()
+            s.kill()
+            self.explosions.emit(e.position, count=self.explosion_particles)
+            self.player_sprite.coins += 1
+
+        # checks for collisions between the player_sprite and coins and fuel
+        self.pickups.collect(self.player_sprite)
+
+        # loses life if you touch enemy
+        for e in self.collision_hash.collisions_with_sprite(self.canon_sprite, "enemies"):
+            if id(e) not in hit:
+                self.player_sprite.energy -= ENEMY_CONTACT_DAMAGE * delta_time
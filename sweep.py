@@ -0,0 +1,312 @@
+"""
+Try out balance changes by letting bots play many games without a window.
+
+Every combination of the given constants from my_world.py is played by a bot
+for a number of seeds, spread over worker processes. Games end when the tank
+runs out of energy or after --seconds. The mean survival time, waves reached
+and score of each combination are shown in a table.
+
+Finished games are appended to a cache file, so running the same sweep again
+only plays the games that are missing.
+
+Usage:
+    python sweep.py -p ENEMY_MOVE_SPEED=16,32,64 -p FUEL_INCREMENT=25,50
+    python sweep.py -p BASE_NUMBER_OF_ENEMYS=5:30:5 --games 8 --workers 4
+    python sweep.py -p FUEL_SPEED_FACTOR=0.005,0.01 --bot aim --output sweep.csv
+"""
+import argparse
+import csv
+import inspect
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import statistics
+import sys
+
+
+# Defaults for the sweep
+SWEEP_GAMES = 4
+SWEEP_SECONDS = 300
+SWEEP_CACHE = "sweep_cache.jsonl"
+SWEEP_DELTA_TIME = 1 / 60
+
+
+def scripted_bot(world, tick):
+    """
+    The input of the benchmark. Drives in circles and fires now and then.
+    """
+    from benchmark import make_inputs
+
+    return make_inputs(tick)
+
+
+def aim_bot(world, tick):
+    """
+    Turns the canon towards the closest enemy and fires when it points at it.
+    Drives towards the closest pickup.
+    """
+    from my_world import PlayerInput
+
+    inputs = PlayerInput()
+    player = world.player_sprite
+    px, py = player.position
+
+    enemies = world.enemy_sprite_list
+    if len(enemies):
+        target = min(enemies, key=lambda e: (e.center_x - px) ** 2 + (e.center_y - py) ** 2)
+        wanted = math.degrees(math.atan2(target.center_y - py, target.center_x - px))
+        turn = (wanted - world.canon_sprite.angle + 180) % 360 - 180
+        inputs.canon_left = turn > 5
+        inputs.canon_right = turn < -5
+        inputs.fire = abs(turn) < 10 and tick % 10 == 0
+
+    pickups = list(world.coin_sprite_list) + list(world.fuel_sprite_list)
+    if pickups:
+        target = min(pickups, key=lambda p: (p.center_x - px) ** 2 + (p.center_y - py) ** 2)
+        wanted = math.degrees(math.atan2(target.center_y - py, target.center_x - px))
+        turn = (wanted - player.angle + 180) % 360 - 180
+        inputs.left = turn > 10
+        inputs.right = turn < -10
+        inputs.forward = True
+
+    return inputs
+
+
+BOTS = {
+    "scripted": scripted_bot,
+    "aim": aim_bot,
+}
+
+
+def parse_values(text):
+    """
+    The values of a parameter, either a list "1,2,3" or a range "start:stop:step"
+    """
+    if ":" in text:
+        start, stop, step = (float(v) for v in text.split(":"))
+        values = []
+        value = start
+        while value <= stop + step / 1000:
+            values.append(value)
+            value += step
+    else:
+        values = [float(v) for v in text.split(",")]
+
+    # Keep whole numbers as ints, the rules use some of them as counts
+    return [int(v) if v == int(v) else v for v in values]
+
+
+def runtime_constants():
+    """
+    The constants of my_world the rules read while they run. Constants only
+    used when the module is imported, like default arguments, can not be
+    changed by a sweep.
+    """
+    import my_world
+
+    code = []
+    for obj in vars(my_world).values():
+        if getattr(obj, "__module__", None) != my_world.__name__:
+            continue
+        members = vars(obj).values() if inspect.isclass(obj) else [obj]
+        for member in members:
+            if isinstance(member, property):
+                code.extend(f.__code__ for f in (member.fget, member.fset) if f is not None)
+            elif inspect.isfunction(member):
+                code.append(member.__code__)
+
+    # The names read by the functions, and by the lambdas inside them
+    names = set()
+    while code:
+        c = code.pop()
+        names.update(c.co_names)
+        code.extend(const for const in c.co_consts if inspect.iscode(const))
+
+    return {name for name in names if name.isupper() and hasattr(my_world, name)}
+
+
+def parse_grid(params):
+    """
+    A dict of constant name -> list of values from the NAME=VALUES arguments
+    """
+    import my_world
+
+    runtime = runtime_constants()
+    grid = {}
+    for param in params:
+        name, sep, values = param.partition("=")
+        if not sep or not values:
+            raise ValueError("Expected NAME=VALUES, got '{}'".format(param))
+        if not name.isupper() or not hasattr(my_world, name):
+            raise ValueError("Unknown constant '{}'".format(name))
+        if name not in runtime:
+            raise ValueError("'{}' is only read when my_world is imported, sweeping it has no effect".format(name))
+        grid[name] = parse_values(values)
+
+    return grid
+
+
+def combinations(grid):
+    """
+    Every combination of the values in the grid, as dicts
+    """
+    names = sorted(grid)
+    return [
+        dict(zip(names, values))
+        for values in itertools.product(*(grid[name] for name in names))
+    ]
+
+
+def game_key(bot, seconds, constants, seed):
+    """
+    The key a game is stored under in the cache
+    """
+    return json.dumps([bot, seconds, constants, seed], sort_keys=True)
+
+
+def play_game(task):
+    """
+    Play one game with the constants changed. Runs in a worker process.
+    """
+    bot, seconds, constants, seed = task
+
+    import my_world
+
+    # The rules read the constants from the module when they run
+    original = {name: getattr(my_world, name) for name in constants}
+    for name, value in constants.items():
+        setattr(my_world, name, value)
+
+    try:
+        world = my_world.World(seed=seed)
+        world.setup()
+        player = world.player_sprite
+        ticks = int(seconds / SWEEP_DELTA_TIME)
+
+        for tick in range(ticks):
+            world.step(SWEEP_DELTA_TIME, BOTS[bot](world, tick))
+            if player.energy <= 0:
+                break
+
+        return {
+            "key": game_key(bot, seconds, constants, seed),
+            "constants": constants,
+            "seed": seed,
+            "survival_seconds": world.ticks * SWEEP_DELTA_TIME,
+            "waves": world.wave_number,
+            "score": player.coins,
+        }
+    finally:
+        for name, value in original.items():
+            setattr(my_world, name, value)
+
+
+def load_cache(filename):
+    """
+    The finished games in the cache file, by key
+    """
+    results = {}
+    if not os.path.exists(filename):
+        return results
+
+    with open(filename) as f:
+        for line in f:
+            # A sweep that was killed can leave half a line at the end
+            try:
+                result = json.loads(line)
+            except ValueError:
+                continue
+            results[result["key"]] = result
+
+    return results
+
+
+def aggregate(combos, results, bot, seconds, games):
+    """
+    A row of means for every combination
+    """
+    rows = []
+    for constants in combos:
+        played = [
+            results[key] for key in (
+                game_key(bot, seconds, constants, seed) for seed in range(games)
+            )
+            if key in results
+        ]
+        row = dict(constants)
+        row["games"] = len(played)
+        for field in ("survival_seconds", "waves", "score"):
+            row[field] = statistics.mean(r[field] for r in played) if played else 0
+        rows.append(row)
+
+    return rows
+
+
+def print_table(rows, names):
+    """
+    Print the rows as a text table
+    """
+    fields = names + ["games", "survival_seconds", "waves", "score"]
+    cells = [
+        [("{:.4g}" if isinstance(row[f], float) else "{}").format(row[f]) for f in fields]
+        for row in rows
+    ]
+    widths = [max(len(f), *(len(c[i]) for c in cells)) for i, f in enumerate(fields)]
+
+    print("  ".join(f.rjust(w) for f, w in zip(fields, widths)))
+    for c in cells:
+        print("  ".join(v.rjust(w) for v, w in zip(c, widths)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep the balance constants of the game")
+    parser.add_argument("-p", "--param", action="append", default=[],
+                        help="NAME=v1,v2,... or NAME=start:stop:step, may be repeated")
+    parser.add_argument("--bot", choices=sorted(BOTS), default="scripted")
+    parser.add_argument("--games", type=int, default=SWEEP_GAMES, help="games (seeds) per combination")
+    parser.add_argument("--seconds", type=float, default=SWEEP_SECONDS, help="most seconds per game")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--cache", default=SWEEP_CACHE, help="file with the finished games")
+    parser.add_argument("--output", help="write the table to a CSV file")
+    args = parser.parse_args()
+
+    try:
+        grid = parse_grid(args.param)
+    except ValueError as e:
+        parser.error(str(e))
+
+    combos = combinations(grid)
+    results = load_cache(args.cache)
+
+    tasks = [
+        (args.bot, args.seconds, constants, seed)
+        for constants in combos
+        for seed in range(args.games)
+        if game_key(args.bot, args.seconds, constants, seed) not in results
+    ]
+    total = len(combos) * args.games
+    print("{} combinations, {} games, {} cached".format(len(combos), total, total - len(tasks)))
+
+    if tasks:
+        with open(args.cache, "a") as cache, multiprocessing.Pool(max(1, args.workers)) as pool:
+            for done, result in enumerate(pool.imap_unordered(play_game, tasks), 1):
+                cache.write(json.dumps(result) + "\n")
+                cache.flush()
+                results[result["key"]] = result
+                print("\r{}/{} games".format(done, len(tasks)), end="", file=sys.stderr)
+        print(file=sys.stderr)
+
+    rows = aggregate(combos, results, args.bot, args.seconds, args.games)
+    print_table(rows, sorted(grid))
+
+    if args.output:
+        with open(args.output, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+if __name__ == "__main__":
+    main()